@@ -16,6 +16,8 @@ CoordSystem = Enum('CoordSystem', 'Polar PolarNorm UV')          # used for sky
 SourceExt = Enum('SourceExt', 'JPG TIFF')                        # used for pixel extraction
 ColorModel = Enum('ColorModel', 'RGB HSV HSL LAB')               # used for pixel color components
 PixelWeighting = Enum('PixelWeighting', 'Mean Median Gaussian')  # used during pixel convolution
+ExportFormat = Enum('ExportFormat', 'CSV Parquet HDF5')         # used for exported datasets
+ExportFormatExts = {ExportFormat.CSV: ".csv", ExportFormat.Parquet: ".parquet", ExportFormat.HDF5: ".h5"}
 SkyCover = Enum('SkyCover', 'UNK CLR SCT OVC')
 SkyCoverDesc = {SkyCover.UNK: "Unknown", SkyCover.CLR: "Clear", SkyCover.SCT: "Scattered", SkyCover.OVC: "Overcast"}
 HDRRawExts = ['.cr2', '.raw', '.dng']  # types of RAW data
@@ -103,9 +105,11 @@ DefDataConfig = {
 # default export options
 DefExportOptions = {
     "Filename": "",
+    "Format": ExportFormat.CSV.value,
     "CoordSystem": CoordSystem.Polar.value,
     "IsHDR": False,
     "SourceExt": SourceExt.JPG.value,
+    "PhotoScale": 1,              # decode JPG photos at 1/scale resolution (1, 2, 4 or 8), faster but approximate if not 1
     "ComputePixelRegion": True,
     "PixelRegion": PixelRegionMin,
     "PixelWeighting": PixelWeighting.Mean.value,
@@ -142,6 +146,12 @@ DefAppSettings = {
     "GraphResolution": 5,
     "GraphLineThickness": 1,
     "HUDTextScale": 60,
+    "SpectrumCacheMB": 64,    # memory budget of loaded ASD spectra cache
+    "ExportProcesses": 0,     # worker processes used when converting datasets (0 for one per core)
+    "PixelCacheMB": 256,      # memory budget of decoded photo pixels cache (used by exports)
+    "PhotoCacheMB": 512,      # memory budget of decoded photos cache (used by viewer)
+    "PrefetchCaptures": 2,    # captures before and after the selected one decoded in the background (0 to disable)
+    "PrefetchThreads": 2,     # background threads used to prefetch captures
 }
 DefAppSettings.update({"ExportOptions": dict(DefExportOptions)})
 
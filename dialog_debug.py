@@ -0,0 +1,77 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# ====================================================================
+# @author: Joe Del Rocco
+# @since: 10/17/2026
+# @summary: Dialog for inspecting the application's caches (entries, memory, hits, misses and evictions).
+# ====================================================================
+from PyQt5.QtGui import QIcon
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import Qt, QTimer
+
+
+'''
+Dialog showing the stats of caches, refreshed while it is open.
+:param parent: Parent widget.
+:param caches: A list of (name, LRUCache, whether size is in bytes) tuples.
+'''
+class DialogDebug(QDialog):
+
+    def __init__(self, parent, caches):
+        super().__init__(parent, Qt.WindowSystemMenuHint | Qt.WindowTitleHint | Qt.WindowCloseButtonHint | Qt.Window)
+
+        self.caches = caches
+
+        # init
+        self.initWidgets()
+        self.setWindowTitle("Caches")
+        self.setWindowIcon(QIcon('res/icon.png'))
+        self.refresh()
+
+        # stats keep changing while the application is used, so keep them up to date while open
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+
+    def initWidgets(self):
+        # layout
+        layout = QVBoxLayout()
+        layout.setSpacing(5)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        # stats table
+        self.tblCaches = QTableWidget(len(self.caches), 7)
+        self.tblCaches.setHorizontalHeaderLabels(["Cache", "Entries", "Size", "Budget", "Hits", "Misses", "Evictions"])
+        self.tblCaches.verticalHeader().hide()
+        self.tblCaches.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tblCaches.setSelectionMode(QAbstractItemView.NoSelection)
+        self.tblCaches.setMinimumWidth(600)
+        layout.addWidget(self.tblCaches)
+
+        # buttons
+        boxButtons = QDialogButtonBox()
+        btn = boxButtons.addButton("Clear Caches", QDialogButtonBox.ResetRole)
+        btn.clicked.connect(self.clearPressed)
+        btn = boxButtons.addButton("Close", QDialogButtonBox.RejectRole)
+        btn.clicked.connect(self.reject)
+        layout.addWidget(boxButtons, 0, Qt.AlignBottom)
+
+        self.setLayout(layout)
+
+    def refresh(self):
+        for row, (name, cache, inbytes) in enumerate(self.caches):
+            stats = cache.stats()
+            size = "{0:.1f} MB".format(stats["Size"] / 1048576) if inbytes else str(stats["Size"])
+            budget = "{0:.1f} MB".format(stats["Budget"] / 1048576) if inbytes else str(stats["Budget"])
+            values = [name, str(stats["Entries"]), size, budget, str(stats["Hits"]), str(stats["Misses"]), str(stats["Evictions"])]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.tblCaches.setItem(row, col, item)
+        self.tblCaches.resizeColumnsToContents()
+
+    def clearPressed(self):
+        for name, cache, inbytes in self.caches:
+            cache.clear()
+        self.refresh()
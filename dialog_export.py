@@ -10,6 +10,7 @@ from PyQt5.QtGui import QIcon, QStandardItem, QStandardItemModel, QIntValidator
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import Qt
 import common
+import utility_export
 
 
 class DialogExport(QDialog):
@@ -18,10 +19,7 @@ class DialogExport(QDialog):
     def validateOptions(options):
         # must have all available options defined
         # ok to have extras, but must have the at least the default set
-        for key in common.DefExportOptions:
-            if (key not in options):
-                return False
-        return True
+        return utility_export.validateOptions(options)
 
     @staticmethod
     def attributeFromIndex(index):
@@ -40,8 +38,10 @@ class DialogExport(QDialog):
         self.initWidgets()
         self.setWindowTitle("Export Options")
         self.setWindowIcon(QIcon('res/icon.png'))
+        self.cbxFormat.setCurrentText(common.ExportFormat(self.exportOptions["Format"]).name)
         self.chxHDR.setChecked(self.exportOptions["IsHDR"])
         self.cbxSourceExt.setCurrentText(common.SourceExt(self.exportOptions["SourceExt"]).name)
+        self.cbxPhotoScale.setCurrentText("1/" + str(self.exportOptions["PhotoScale"]))
         self.cbxColorModel.setCurrentText(common.ColorModel(self.exportOptions["ColorModel"]).name)
         self.chxPixRegCalc.setChecked(self.exportOptions["ComputePixelRegion"])
         self.cbxPixRegFixed.setEnabled(not self.exportOptions["ComputePixelRegion"])
@@ -79,6 +79,18 @@ class DialogExport(QDialog):
         pnlFile.setLayout(boxFile)
         layout.addWidget(pnlFile, 0, Qt.AlignTop)
 
+        # format
+        self.cbxFormat = QComboBox()
+        self.cbxFormat.setSizeAdjustPolicy(QComboBox.AdjustToContents)
+        self.cbxFormat.addItems([str(f.name) for f in common.ExportFormat])
+        self.cbxFormat.currentIndexChanged.connect(self.formatChanged)
+        boxFormat = QHBoxLayout()
+        boxFormat.addWidget(self.cbxFormat)
+        boxFormat.addStretch(1)
+        grpFormat = QGroupBox("Format:", self)
+        grpFormat.setLayout(boxFormat)
+        layout.addWidget(grpFormat, 0, Qt.AlignTop)
+
         # sample features
         self.lstSampleFeatures = QListView()
         model = QStandardItemModel()
@@ -113,8 +125,13 @@ class DialogExport(QDialog):
         self.cbxSourceExt = QComboBox()
         self.cbxSourceExt.setSizeAdjustPolicy(QComboBox.AdjustToContents)
         self.cbxSourceExt.addItems([str(cm.name) for cm in common.SourceExt])
+        self.cbxPhotoScale = QComboBox()
+        self.cbxPhotoScale.setSizeAdjustPolicy(QComboBox.AdjustToContents)
+        self.cbxPhotoScale.addItems(["1/" + str(s) for s in (1, 2, 4, 8)])
+        self.cbxPhotoScale.setToolTip("Resolution JPG photos are decoded at (reduced is faster, but pixels are approximate)")
         boxSource = QHBoxLayout()
         boxSource.addWidget(self.cbxSourceExt)
+        boxSource.addWidget(self.cbxPhotoScale)
         grpSource = QGroupBox("Source:", self)
         grpSource.setLayout(boxSource)
 
@@ -225,12 +242,20 @@ class DialogExport(QDialog):
             return
 
         # apply default extension, if missing
-        base, extension = os.path.splitext(filename)
-        if extension is None or len(extension) <= 0:
-            extension = ".csv"
-        elif extension.lower() != ".csv":
-            extension += ".csv"
-        self.txtFile.setText(base + extension)
+        self.txtFile.setText(self.filenameWithExtension(filename))
+
+    def filenameWithExtension(self, filename):
+        extension = common.ExportFormatExts[common.ExportFormat[self.cbxFormat.currentText()]]
+        base, ext = os.path.splitext(filename)
+        if ext.lower() == extension:
+            return filename
+        if ext.lower() in common.ExportFormatExts.values():
+            return base + extension
+        return filename + extension
+
+    def formatChanged(self, index):
+        if len(self.txtFile.text()) > 0:
+            self.txtFile.setText(self.filenameWithExtension(self.txtFile.text()))
 
     def pixRegCalcChanged(self, int):
         if (self.chxPixRegCalc.isChecked()):
@@ -247,17 +272,22 @@ class DialogExport(QDialog):
             if QMessageBox.warning(self, "Warning", "Exported samples will be appended to an existing file.\nAre you sure you want to do this?", QMessageBox.Yes | QMessageBox.No) != QMessageBox.Yes:
                 return
 
-        # append .csv extension if not done already
-        base, extension = os.path.splitext(self.txtFile.text())
-        if extension.lower() != ".csv":
-            self.txtFile.setText(base + extension + ".csv")
+        # append format extension if not done already
+        self.txtFile.setText(self.filenameWithExtension(self.txtFile.text()))
+        format = common.ExportFormat[self.cbxFormat.currentText()]
+        error = utility_export.formatError(format)
+        if len(error) > 0:
+            QMessageBox.critical(self, "Error", error, QMessageBox.Ok)
+            return
 
         # save export file
         self.exportOptions["Filename"] = self.txtFile.text()
+        self.exportOptions["Format"] = format.value
 
         # save pixel options
         self.exportOptions["IsHDR"] = self.chxHDR.isChecked()
         self.exportOptions["SourceExt"] = common.SourceExt[self.cbxSourceExt.currentText()].value
+        self.exportOptions["PhotoScale"] = int(self.cbxPhotoScale.currentText().split("/")[1])
         self.exportOptions["ColorModel"] = common.ColorModel[self.cbxColorModel.currentText()].value
         self.exportOptions["ComputePixelRegion"] = self.chxPixRegCalc.isChecked()
         self.exportOptions["PixelRegion"] = int(self.cbxPixRegFixed.currentText())
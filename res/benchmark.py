@@ -0,0 +1,131 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# ====================================================================
+# @author: Joe Del Rocco
+# @since: 10/17/2026
+# @summary: Script to benchmark the data loading and sampling routines of SpectralSkyViewer.
+# ====================================================================
+import sys
+import os
+import argparse
+import timeit
+import numpy as np
+from PIL import Image
+# we need our utilities
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import common
+import utility_spectra
+import utility_data
+
+
+def timed(func, repeat):
+    times = timeit.repeat(func, number=1, repeat=repeat)
+    return min(times), sum(times) / len(times)
+
+def report(name, best, mean, count, unit="file"):
+    print("{0:<24} best {1:9.3f} ms   mean {2:9.3f} ms   ({3:.4f} ms per {4})".format(name, best * 1000, mean * 1000, mean * 1000 / count, unit))
+
+def findASDFiles(path):
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for root, dirs, names in os.walk(path):
+        files.extend([os.path.join(root, f) for f in sorted(names) if f.lower().endswith(utility_spectra.SpectraExt)])
+    return files
+
+def BenchASDParse(args):
+    files = findASDFiles(args.path)
+    if len(files) <= 0:
+        print("No ASD text files found in: " + args.path)
+        return
+    files = files[:args.max]
+    print("Parsing " + str(len(files)) + " ASD files (step " + str(args.step) + ")...")
+
+    # both parsers must agree
+    for f in files:
+        fast = utility_spectra.parseASDText(f, args.step)
+        slow = utility_spectra.parseASDTextSlow(f, args.step)
+        if not np.array_equal(fast[0], slow[0]) or not np.allclose(fast[1], slow[1], equal_nan=True):
+            print("Mismatch: " + f)
+            return
+
+    slowBest, slowMean = timed(lambda: [utility_spectra.parseASDTextSlow(f, args.step) for f in files], args.repeat)
+    fastBest, fastMean = timed(lambda: [utility_spectra.parseASDText(f, args.step) for f in files], args.repeat)
+    report("genfromtxt", slowBest, slowMean, len(files))
+    report("fromstring", fastBest, fastMean, len(files))
+    print("Speedup: {0:.1f}x".format(slowMean / fastMean))
+
+def collectPixelsLoop(pixels, points, regions, weighting):
+    result = []
+    for i, p in enumerate(points):
+        if regions[i] == 1:
+            result.append(pixels[int(p[1]), int(p[0])])
+        elif weighting == common.PixelWeighting.Gaussian:
+            result.append(utility_data.pixelWeightedGaussian(pixels, p, utility_data.gaussianKernel(regions[i])))
+        elif weighting == common.PixelWeighting.Median:
+            result.append(utility_data.pixelWeightedMedian(pixels, p, regions[i]))
+        else:
+            result.append(utility_data.pixelWeightedMean(pixels, p, regions[i]))
+    return result
+
+def BenchSampling(args):
+    if args.path:
+        image = Image.open(args.path)
+        pixels = np.array(image)
+        image.close()
+    else:
+        pixels = np.random.randint(0, 256, size=(args.height, args.width, 3), dtype=np.uint8)
+    weighting = common.PixelWeighting[args.weighting]
+    radius = int(max(args.regions) / 2)
+    rng = np.random.RandomState(0)
+    xs = rng.randint(radius, pixels.shape[1] - radius, args.count)
+    ys = rng.randint(radius, pixels.shape[0] - radius, args.count)
+    points = list(zip(xs.tolist(), ys.tolist()))
+    regions = [args.regions[i % len(args.regions)] for i in range(0, args.count)]
+    print("Sampling " + str(args.count) + " points of a " + str(pixels.shape) + " image (regions " + str(args.regions) + ", " + weighting.name + ")...")
+
+    # both samplers must agree
+    loop = collectPixelsLoop(pixels, points, regions, weighting)
+    batch = utility_data.collectPixels(points, regions, pixels=pixels, weighting=weighting)
+    if not np.array_equal(np.array(loop), np.array(batch)):
+        print("Mismatch between per point and batched sampling")
+        return
+
+    loopBest, loopMean = timed(lambda: collectPixelsLoop(pixels, points, regions, weighting), args.repeat)
+    batchBest, batchMean = timed(lambda: utility_data.collectPixels(points, regions, pixels=pixels, weighting=weighting), args.repeat)
+    report("per point", loopBest, loopMean, args.count, "point")
+    report("batched", batchBest, batchMean, args.count, "point")
+    print("Speedup: {0:.1f}x".format(loopMean / batchMean))
+
+
+def main():
+    # handle command line args
+    parser = argparse.ArgumentParser(description='Script to benchmark SpectralSkyViewer data routines.', formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_help = True
+    subparsers = parser.add_subparsers(dest='bench')
+    sub = subparsers.add_parser('asdparse', help='ASD text file parsing')
+    sub.add_argument('path', help='an ASD text file or a directory of them (searched recursively)')
+    sub.add_argument('-s', '--step', dest='step', type=int, default=1, help='rows of each file to load')
+    sub.add_argument('-m', '--max', dest='max', type=int, default=200, help='max number of files to parse')
+    sub.add_argument('-r', '--repeat', dest='repeat', type=int, default=5, help='number of timed runs')
+    sub = subparsers.add_parser('sampling', help='pixel region sampling (collectPixels)')
+    sub.add_argument('path', nargs='?', help='a photo to sample (defaults to random pixels)')
+    sub.add_argument('-W', '--width', dest='width', type=int, default=4896, help='width of random image')
+    sub.add_argument('-H', '--height', dest='height', type=int, default=3264, help='height of random image')
+    sub.add_argument('-n', '--count', dest='count', type=int, default=81, help='number of points to sample')
+    sub.add_argument('-k', '--regions', dest='regions', type=int, nargs='+', default=[1, 3, 5, 7, 9], help='region sizes (assigned to points in turn)')
+    sub.add_argument('-w', '--weighting', dest='weighting', choices=[w.name for w in common.PixelWeighting], default=common.PixelWeighting.Gaussian.name, help='pixel weighting')
+    sub.add_argument('-r', '--repeat', dest='repeat', type=int, default=20, help='number of timed runs')
+    args = parser.parse_args()
+
+    if args.bench == 'asdparse':
+        BenchASDParse(args)
+    elif args.bench == 'sampling':
+        BenchSampling(args)
+    else:
+        parser.print_help()
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
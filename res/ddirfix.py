@@ -17,6 +17,8 @@ import rawpy
 sys.path.insert(0, '../')
 import utility
 import utility_data
+import utility_correlation
+import utility_spectra
 
 
 #-----------------------------
@@ -119,6 +121,8 @@ def ListSubDirectories(args):
         print(dir)
 
 '''
+Function that finds the nearest ASD capture (w/in a number of seconds) of every HDR capture in a data directory.
+:param args: ArgumentParser arguments parsed at program startup
 '''
 def CorrelateCaptures(args):
     print("Finding HDR/ASD capture times w/in " + str(args.correlatecaptures) + "s in:\n" + args.directory)
@@ -137,9 +141,7 @@ def CorrelateCaptures(args):
         return
 
     # iterate through all capture dates and find all HDR and ASD captures
-    hdrCaptures = []
-    asdCaptures = []
-    correlatedCaptures = []
+    captures = {}
     for datedir in dateDirs:
         #print(datedir)
 
@@ -149,12 +151,10 @@ def CorrelateCaptures(args):
         if (len(hdrCaptures) <= 0):
             print("No HDR directories found at all.")
             return
-        hdrCaptures = [(datetime.strptime(os.path.basename(datedir) + " " + os.path.basename(dir), '%Y-%m-%d %H.%M.%S'), dir) for dir in hdrCaptures if utility.verifyDateTime(os.path.basename(dir), "%H.%M.%S")]
+        hdrCaptures = [os.path.basename(dir) for dir in hdrCaptures if utility.verifyDateTime(os.path.basename(dir), "%H.%M.%S")]
         if (len(hdrCaptures) <= 0):
             print("No HDR captures found.")
             return
-        #for capture in hdrCaptures:
-        #    print(capture[0], capture[1])
 
         # grab all capture ASD captures
         asdDir = os.path.join(datedir, "ASD")
@@ -162,29 +162,24 @@ def CorrelateCaptures(args):
         if (len(asdCaptures) <= 0):
             print("No ASD directories found at all.")
             return
-        asdCaptures = [(datetime.strptime(os.path.basename(datedir) + " " + os.path.basename(dir), '%Y-%m-%d %H.%M.%S'), dir) for dir in asdCaptures if utility.verifyDateTime(os.path.basename(dir), "%H.%M.%S")]
+        asdCaptures = [os.path.basename(dir) for dir in asdCaptures if utility.verifyDateTime(os.path.basename(dir), "%H.%M.%S")]
         if (len(asdCaptures) <= 0):
             print("No ASD captures found.")
             return
-        #for capture in asdCaptures:
-        #    print(capture[0], capture[1])
 
-        # correlate HDR to ASD captures
-        for i in range(0, len(hdrCaptures)):
-            for j in range(0, len(asdCaptures)):
-                diff = abs((hdrCaptures[i][0] - asdCaptures[j][0]).total_seconds())
-                #print(hdrCaptures[i][0], asdCaptures[j][0], diff)
-                if (diff <= args.correlatecaptures):
-                    correlatedCaptures.append((hdrCaptures[i][0], hdrCaptures[i][1], asdCaptures[j][0], asdCaptures[j][1]))
+        captures[os.path.basename(datedir)] = (hdrCaptures, asdCaptures)
+
+    # correlate each HDR capture to its nearest ASD capture (all dates at once)
+    correlatedCaptures = utility_correlation.correlateArchive(captures, args.correlatecaptures)
 
     print("Found " + str(len(correlatedCaptures)) + " captures w/in " + str(args.correlatecaptures) + "s")
     prev = None
-    for capture in correlatedCaptures:
-        if prev != capture[0].date():
-            print(capture[1])
-            print(capture[3])
-            prev = capture[0].date()
-        print("HDR:", capture[0], "ASD:", capture[2])
+    for datestr, hdrstr, asdstr, delta in correlatedCaptures:
+        if prev != datestr:
+            print(os.path.join(args.directory, datestr, "HDR", hdrstr))
+            print(os.path.join(args.directory, datestr, "ASD", asdstr))
+            prev = datestr
+        print("HDR:", datestr, hdrstr.replace('.', ':'), "ASD:", datestr, asdstr.replace('.', ':'))
     print("Found " + str(len(correlatedCaptures)) + " captures w/in " + str(args.correlatecaptures) + "s")
 
 '''
@@ -614,6 +609,38 @@ def ASDOrganizeFiles(args):
         for f in filesToMove:
             shutil.move(f[0], f[1])
 
+'''
+Function that packs the .asd.rad.txt files of each ASD capture directory into a binary store (see utility_spectra).
+This makes loading radiance (graphing, exporting, converting) much faster. Stale stores are simply repacked.
+:param args: ArgumentParser arguments parsed at program startup
+'''
+def ASDPackFiles(args):
+    print("Packing ASD files of capture directories in:\n" + args.directory)
+    # ensure directory exists
+    if (not os.path.exists(args.directory)):
+        return
+
+    # grab all capture timestamp directories (at any depth)
+    timeDirs = [args.directory] + utility.findFiles(args.directory, mode=2, recursive=True)
+    timeDirs[:] = [dir for dir in timeDirs if utility.verifyDateTime(os.path.basename(dir), "%H.%M.%S")]
+    if (len(timeDirs) <= 0):
+        print("No capture time directories found.")
+        return
+
+    # for each timestamp directory
+    packed = 0
+    for dir in sorted(timeDirs):
+        if (not args.readonly):
+            count = utility_spectra.packASDCapture(dir)
+            if (count <= 0):
+                print("Skipped (no files or mismatched wavelengths): " + dir)
+                continue
+            print("Packed " + str(count) + " files: " + dir)
+        else:
+            print("Pack: " + dir)
+        packed += 1
+    print("Packed " + str(packed) + " capture directories")
+
 '''
 Function to create an .asd.rad.txt file filled with a specified literal value. 
 :note: This is only useful if the .asd.rad.txt file couldn't be generated properly (e.g. .asd file is corrupt, etc.)   
@@ -667,6 +694,7 @@ def main():
     parser.add_argument('-hx', '--hdrextension', dest='hdrextension', type=str, help='file extension of image', default='jpg')
     # arguments specific to ASD
     parser.add_argument('-af', '--asdfill', dest='asdfill', type=float, help='fill a new .asd.rad.txt file w/ literal')
+    parser.add_argument('-ap', '--asdpack', dest='asdpack', action='store_true', help='pack .asd.rad.txt files of capture dirs into binary stores', default=False)
     args = parser.parse_args()
 
     # file required as parameter
@@ -703,6 +731,8 @@ def main():
             ASDOrganizeFiles(args)
         elif (args.asdfill):
             ASDFillFile(args)
+        elif (args.asdpack):
+            ASDPackFiles(args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# ====================================================================
+# @author: Joe Del Rocco
+# @since: 10/17/2026
+# @summary: Headless (no Qt) batch export of sky samples of a data directory to a dataset file.
+# ====================================================================
+import sys
+import os
+import argparse
+import time
+import common
+import utility_data
+import utility_catalog
+import utility_export
+
+
+def main():
+    # handle command line args
+    parser = argparse.ArgumentParser(description='Export sky samples of all captures in a data directory (or range of dates) without the GUI.', formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_help = True
+    parser.add_argument('output', help='dataset file to export to (appended to if it exists)')
+    parser.add_argument('-d', '--datadir', dest='datadir', help='data directory (defaults to data directory of app settings)')
+    parser.add_argument('-s', '--start', dest='start', help='first capture date to export (e.g. 2012-11-06)')
+    parser.add_argument('-e', '--end', dest='end', help='last capture date to export (e.g. 2013-05-27)')
+    parser.add_argument('-x', '--exposure', dest='exposure', type=float, help='exposure (s) of photos to sample (defaults to first exposure), ignored for HDR exports')
+    parser.add_argument('-p', '--samples', dest='samples', type=int, nargs='+', help='sampling pattern indices to export (defaults to all)')
+    parser.add_argument('-a', '--avoidsun', dest='avoidsun', type=float, help='circumsolar avoidance angle (defaults to app settings)')
+    parser.add_argument('-r', '--scale', dest='scale', type=int, choices=[1, 2, 4, 8], help='decode JPG photos at 1/scale resolution, faster but approximate (defaults to export options of app settings)')
+    parser.add_argument('-f', '--format', dest='format', choices=[f.name.lower() for f in common.ExportFormat], help='dataset format (defaults to export options of app settings)')
+    parser.add_argument('-j', '--processes', dest='processes', type=int, default=0, help='number of export processes (defaults to one per core)')
+    parser.add_argument('-o', '--overwrite', dest='overwrite', action='store_true', help='overwrite dataset file if it exists')
+    args = parser.parse_args()
+
+    # load settings (export options are those last used in the application)
+    utility_data.loadAppSettings()
+    if args.datadir:
+        common.AppSettings["DataDirectory"] = args.datadir
+    datadir = common.AppSettings["DataDirectory"]
+    if len(datadir) <= 0 or not os.path.exists(datadir):
+        print("Error: Data directory not found: '" + datadir + "'")
+        sys.exit(2)
+    if not utility_data.loadDataConfig():
+        print("Error: Data directory config not found or invalid: '" + datadir + "'")
+        sys.exit(2)
+    xoptions = common.AppSettings["ExportOptions"]
+    if not utility_export.validateOptions(xoptions):
+        xoptions = dict(common.DefExportOptions)
+    if args.scale:
+        xoptions = dict(xoptions)
+        xoptions["PhotoScale"] = args.scale
+    if args.format:
+        xoptions = dict(xoptions)
+        xoptions["Format"] = common.ExportFormat[[f.name for f in common.ExportFormat if f.name.lower() == args.format][0]].value
+
+    # validate args
+    exposure = common.Exposures[0] if args.exposure is None else args.exposure
+    if not xoptions["IsHDR"] and exposure not in common.ExposureIdxMap:
+        print("Error: Exposure " + str(exposure) + "s not in data config exposures: " + str(common.Exposures))
+        sys.exit(2)
+    samples = list(range(0, len(common.SamplingPattern))) if not args.samples else args.samples
+    if any(i < 0 or i >= len(common.SamplingPattern) for i in samples):
+        print("Error: Sampling pattern indices must be in range [0, " + str(len(common.SamplingPattern) - 1) + "]")
+        sys.exit(2)
+    avoidsun = common.AppSettings["AvoidSunAngle"] if args.avoidsun is None else args.avoidsun
+    if args.overwrite:
+        utility_export.removeDataset(args.output)
+
+    # find captures to export
+    utility_catalog.loadCatalog(datadir)
+    captures = utility_export.findCaptures(datadir, args.start, args.end)
+    if len(captures) <= 0:
+        print("No captures found to export.")
+        return
+    if os.path.exists(args.output):
+        dataset, error = utility_export.openDataset(args.output, xoptions)
+        if dataset is None:
+            print(error)
+            sys.exit(2)
+        print("Appending to " + args.output + " (" + str(dataset.count()) + " existing samples)")
+        dataset.close()
+
+    # export
+    print("Exporting " + str(len(captures)) + " captures...")
+    jobs = []
+    for capture in captures:
+        spa = utility_data.deepcopySPAData(common.SPASiteData)
+        utility_data.fillSPADateTime(spa, capture)
+        sunpos = utility_data.computeSunPosition(spa)
+        jobs.append((capture, utility_export.avoidSun(samples, sunpos, avoidsun), exposure))
+    started = time.time()
+    progress = {"Total": 0}
+    def printProgress(i, count, capture, exported, error):
+        if len(error) > 0:
+            print(error)
+        progress["Total"] += exported
+        elapsed = time.time() - started
+        print("[{0}/{1}] {2} {3} samples ({4:.1f} samples/s)".format(i + 1, count, capture, exported, progress["Total"] / elapsed if elapsed > 0 else 0))
+    total, failed = utility_export.exportCaptures(datadir, args.output, xoptions, jobs, args.processes, printProgress)
+
+    # summary
+    elapsed = time.time() - started
+    print("Exported {0} samples of {1} captures ({2} failed) in {3:.2f}s, {4:.1f} samples/s".format(total, len(captures) - failed, failed, elapsed, total / elapsed if elapsed > 0 else 0))
+
+
+if __name__ == "__main__":
+    main()
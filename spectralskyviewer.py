@@ -9,22 +9,24 @@ import sys
 import os
 import json
 import csv
-import math
 from datetime import datetime
 from PyQt5.QtCore import Qt, QDir
 from PyQt5.QtGui import QIcon, QFont
 from PyQt5.QtWidgets import *
 import pyqtgraph as pg
-from colormath.color_objects import sRGBColor, HSVColor, HSLColor, LabColor
-from colormath.color_conversions import convert_color
 import common
 import utility
 import utility_data
-import utility_angles
+import utility_catalog
+import utility_export
+import utility_prefetch
+import utility_photo
+import utility_spectra
 from view_fisheye import ViewFisheye
 from dialog_export import DialogExport
 from dialog_converter import DialogConverter
 from dialog_slider import DialogSlider
+from dialog_debug import DialogDebug
 
 
 class SpectralSkyViewer(QMainWindow):
@@ -36,11 +38,18 @@ class SpectralSkyViewer(QMainWindow):
         self.capture = datetime.min
         self.captureTimeHDRDirs = []   # some number of these per day
         self.captureTimeASDFiles = []  # length should be equal to sampling pattern length
+        self.captureIndex = -1         # index of selected capture time
         self.exposure = 0
+        self.exportDataset = None      # Parquet dataset exported to, kept open for the session (see exportSamples)
         self.dontSaveSettings = False
 
         # load application settings
         utility_data.loadAppSettings()
+        utility_photo.PhotoCache.resize(max(common.AppSettings["PhotoCacheMB"], 0) * 1048576)
+
+        # neighbouring captures are prepared in the background while scrubbing
+        prefetch = max(common.AppSettings["PrefetchCaptures"], 0)
+        self.prefetcher = utility_prefetch.Prefetcher(common.AppSettings["PrefetchThreads"], 2 * prefetch + 1)
 
         # init
         QToolTip.setFont(QFont('SansSerif', 8))
@@ -197,6 +206,9 @@ class SpectralSkyViewer(QMainWindow):
         actDontSave.setChecked(False)
         actDontSave.setStatusTip('Use this to prevent the application from stomping your settings')
         actDontSave.triggered.connect(self.toggleDontSave)
+        actCaches = QAction(QIcon(), 'Show Caches', self)
+        actCaches.setStatusTip('Show memory use and hit rates of caches (for debugging)')
+        actCaches.triggered.connect(self.toggleCaches)
 
         # menubar
         menubar = self.menuBar()
@@ -241,6 +253,7 @@ class SpectralSkyViewer(QMainWindow):
         menu = menubar.addMenu('&Help')
         menu.addAction(actAbout)
         menu.addAction(actDontSave)
+        menu.addAction(actCaches)
 
         # # toolbar
         # toolbar = self.addToolBar('Toolbar')
@@ -417,6 +430,8 @@ class SpectralSkyViewer(QMainWindow):
             return
 
         # reset GUI
+        self.prefetcher.clear()
+        self.captureIndex = -1
         self.captureTimeHDRDirs = []
         self.captureTimeASDFiles = []
         self.lblData.clear()
@@ -440,9 +455,8 @@ class SpectralSkyViewer(QMainWindow):
         self.cbxExposure.addItems([str(x) for x in common.Exposures])
 
         # find and add capture dates to GUI
-        captureDateDirs = utility.findFiles(common.AppSettings["DataDirectory"], mode=2)
-        captureDateDirs[:] = [dir for dir in captureDateDirs if utility.verifyDateTime(os.path.basename(dir), "%Y-%m-%d")]
-        captureDates = [os.path.basename(dir) for dir in captureDateDirs]
+        utility_catalog.loadCatalog(common.AppSettings["DataDirectory"], reload=True)
+        captureDates = utility_catalog.findCaptureDates(common.AppSettings["DataDirectory"])
         if len(captureDates) > 0:
             self.cbxDate.addItems(captureDates)
 
@@ -475,8 +489,8 @@ class SpectralSkyViewer(QMainWindow):
             return
 
         # find all capture time dirs
-        self.captureTimeHDRDirs = utility.findFiles(pathHDR, mode=2)
-        self.captureTimeHDRDirs[:] = [dir for dir in self.captureTimeHDRDirs if utility.verifyDateTime(os.path.basename(dir), "%H.%M.%S")]
+        captureTimes = utility_catalog.findCaptureTimes(common.AppSettings["DataDirectory"], self.cbxDate.itemText(index))
+        self.captureTimeHDRDirs = [os.path.join(pathHDR, t) for t in captureTimes]
         if len(self.captureTimeHDRDirs) <= 0:
             QMessageBox.critical(self, "Error", "No HDR capture folders found.\nFormat is time of capture (e.g. 08.57.23).", QMessageBox.Ok)
             return
@@ -537,8 +551,14 @@ class SpectralSkyViewer(QMainWindow):
         # At this point we are assuming the photos are sorted (increasing) by exposure time!!!
         # TODO: A safer method would be to gather all EXIF DateTimeOriginal fields and sort manually
 
-        # gather all exposure photos taken at time selected
-        photos = utility.findFiles(self.captureTimeHDRDirs[index], mode=1, ext=["jpg"])
+        # gather all exposure photos taken at time selected (likely already prepared in the background)
+        capture = self.captureTime(index)
+        prepared = self.prefetcher.get(capture, self.exposure)
+        if prepared is None:
+            prepared = utility_prefetch.prepareCapture(common.AppSettings["DataDirectory"], capture, self.exposure)
+        self.prefetcher.put(prepared)
+        self.prefetchCaptures(index)
+        photos = prepared["Photos"]
         if len(photos) <= 0:
             self.log("Error: No photos found in:\n" + self.captureTimeHDRDirs[index])
             return
@@ -550,13 +570,12 @@ class SpectralSkyViewer(QMainWindow):
             return
 
         # cache capture datetime
-        captureStr = str(self.capture.date()) + " " + os.path.basename(self.captureTimeHDRDirs[index])
-        self.capture = datetime.strptime(captureStr, "%Y-%m-%d %H.%M.%S")
+        self.capture = capture
         # print("date: " + str(self.capture), widget)
         self.statusBar().showMessage("Capture: " + str(self.capture) + ", Exposure: " + str(common.Exposures[self.exposure]) + "s")
 
-        # extract EXIF data from photo
-        exif = utility_data.imageEXIF(photos[self.exposure])
+        # EXIF data of photo
+        exif = prepared["EXIF"]
         #exif = {k: v for k, v in exif.items() if k.startswith("EXIF")} # filter down to EXIF tags only
 
         # update datetime panel
@@ -582,49 +601,24 @@ class SpectralSkyViewer(QMainWindow):
 
         # render pane
         utility_data.fillSPADateTime(common.SPASiteData, self.capture)
-        sunpos = utility_data.computeSunPosition(common.SPASiteData)
-        self.wgtFisheye.setSunPosition(sunpos)
-        self.wgtFisheye.setPhoto(photos[self.exposure], exif=exif)
+        self.wgtFisheye.setSunPosition(prepared["SunPosition"])
+        self.wgtFisheye.setPhoto(photos[self.exposure], exif=exif, photo=prepared["Photo"])
         self.wgtFisheye.setSkycover(utility_data.findCaptureSkyCover(self.capture, common.SkyCoverData))
         self.wgtFisheye.repaint()
 
-        # find ASD data path
-        pathDate = os.path.join(common.AppSettings["DataDirectory"], str(self.capture.date()))
-        if not os.path.exists(pathDate):
-            return
-        pathASD = os.path.join(pathDate, "ASD")
-        if not os.path.exists(pathASD):
-            self.log("Error: No ASD data found for: " + str(self.capture.date()))
-            return
-
-        # find all capture time dirs
-        captureTimeASDDirs = utility.findFiles(pathASD, mode=2)
-        captureTimeASDDirs[:] = [dir for dir in captureTimeASDDirs if utility.verifyDateTime(os.path.basename(dir), "%H.%M.%S")]
-        if len(captureTimeASDDirs) <= 0:
-            self.log("Error: No ASD capture time dirs found: " + str(self.capture.date()))
-            return
-
         # find an ASD capture time within small threshold of HDR capture time
-        asdTime = None
         threshold = common.DataConfig["CaptureEpsilon"]  # seconds
-        for dir in captureTimeASDDirs:
-            timestr = str(self.capture.date()) + " " + os.path.basename(dir)
-            time = datetime.strptime(timestr, "%Y-%m-%d %H.%M.%S")
-            delta = (self.capture - time).total_seconds()
-            if abs(delta) <= threshold:
-                asdTime = time
-                break
+        asdTime = prepared["ASDCapture"]
 
         # is there an equivalent ASD capture?
-        if asdTime is None:
+        if len(asdTime) <= 0:
             self.log("Error: No ASD capture time dir found within " + str(threshold) + "s of HDR capture time: " + str(self.capture))
             return
 
         # gather all ASD files for capture time
-        asdTimeDir = os.path.join(pathASD, str(asdTime.time()).replace(":", "."))
-        self.captureTimeASDFiles = utility.findFiles(asdTimeDir, mode=1, ext=[".txt"])
+        self.captureTimeASDFiles = prepared["ASDFiles"]
         if len(self.captureTimeASDFiles) <= 0:
-            self.log("Error: No ASD .txt files found for: " + str(asdTime))
+            self.log("Error: No ASD .txt files found for: " + str(self.capture.date()) + " " + asdTime)
             return
         if len(self.captureTimeASDFiles) != len(common.SamplingPattern):
             self.log("Error: Found " + str(len(self.captureTimeASDFiles)) + " ASD files. Sampling pattern should have " + str(len(common.SamplingPattern)))
@@ -633,6 +627,20 @@ class SpectralSkyViewer(QMainWindow):
         # graph ASD data
         self.graphSamples(self.wgtFisheye.samplesSelected)
 
+    def captureTime(self, index):
+        captureStr = str(self.capture.date()) + " " + os.path.basename(self.captureTimeHDRDirs[index])
+        return datetime.strptime(captureStr, "%Y-%m-%d %H.%M.%S")
+
+    def prefetchCaptures(self, index):
+        # selected capture first, then neighbours alternating, in the direction of scrubbing first
+        step = -1 if index < self.captureIndex else 1
+        self.captureIndex = index
+        indices = [index]
+        for i in range(1, max(common.AppSettings["PrefetchCaptures"], 0) + 1):
+            indices += [index + step * i, index - step * i]
+        indices = [i for i in indices if 0 <= i < len(self.captureTimeHDRDirs)]
+        self.prefetcher.schedule(common.AppSettings["DataDirectory"], [self.captureTime(i) for i in indices], self.exposure)
+
     def timeChangeWheelEvent(self, event):
         self.sldTime.event(event)
 
@@ -667,20 +675,10 @@ class SpectralSkyViewer(QMainWindow):
     def selectSamples(self, message):
         self.wgtFisheye.selectSamples(message)
 
-    def exportSamples(self, message, extra=None):
+    def exportSamples(self, message):
         xoptions = common.AppSettings["ExportOptions"]
-
-        # handle differences between export and convert
-        if message != 'convert':
-            fileout = xoptions["Filename"]
-            samples = self.wgtFisheye.samplesSelected
-            capture = self.capture
-            exposure = common.Exposures[self.exposure]
-        else:
-            fileout = extra["DatasetOut"]
-            samples = extra["SamplesSelected"]
-            capture = extra["Capture"]
-            exposure = extra["Exposure"] if extra["Exposure"] > 0 else common.Exposures[self.exposure] if self.exposure > -1 else common.Exposures[0]
+        fileout = xoptions["Filename"]
+        samples = self.wgtFisheye.samplesSelected
 
         # we shouldn't be here if export file hasn't been configured
         if len(fileout) <= 0:
@@ -691,234 +689,31 @@ class SpectralSkyViewer(QMainWindow):
             self.log("Info: No samples selected. Nothing to export.")
             return
 
-        if message != 'convert':
-            self.log("Export preparations... ")
+        self.log("Exporting... ")
 
-        # find photos for every exposure we intend to export
-        exposures = []  # list of exposures to export
-        expphotos = []  # list of photos per exposure
-        if not xoptions["IsHDR"]:
-            photo = utility_data.findHDRFile(common.AppSettings["DataDirectory"], capture, exposure, common.SourceExt(xoptions["SourceExt"]).name.lower())
-            if not photo or len(photo) <= 0:
-                self.log("Error: Photo for " + exposure + "s exposure not found. Export canceled.")
+        # Parquet datasets are kept open, so the whole session goes into one part file instead of one per export
+        # (CSV and HDF5 datasets are appended in place, so they are only open while exporting and readable in between)
+        if self.exportDataset is None and common.ExportFormat(xoptions["Format"]) == common.ExportFormat.Parquet:
+            self.exportDataset, error = utility_export.openDataset(fileout, xoptions)
+            if self.exportDataset is None:
+                self.log(error)
                 return
-            exposures.append(exposure)
-            expphotos.append(photo)
-        else:
-            for exp in common.Exposures:
-                photo = utility_data.findHDRFile(common.AppSettings["DataDirectory"], capture, exp, common.SourceExt(xoptions["SourceExt"]).name.lower())
-                if not photo or len(photo) <= 0:
-                    self.log("Error: Photo for exposure '" + str(exp) + "' not found. Export canceled.")
-                    return
-                exposures.append(exp)
-                expphotos.append(photo)
-
-        # find ASD files for every sample in sampling pattern (otherwise indexing will be off)
-        asdfiles = []  # list of asd files for current capture
-        if message != 'convert':
-            asdfiles = self.captureTimeASDFiles  # we already found them when user scrolled to capture time
-        else:
-            asdfiles = utility_data.findASDFiles(common.AppSettings["DataDirectory"], capture)
-        if len(asdfiles) <= 0:
-            self.log("Error: No ASD .txt files found for " + str(capture) + ". Export canceled.")
-            return
-        if len(asdfiles) != len(common.SamplingPattern):
-            self.log("Error: Found " + str(len(asdfiles)) + " ASD files for " + str(capture) +". Sample pattern should have " + str(len(common.SamplingPattern)) + ". Export canceled.")
+
+        # ASD files were already found when user scrolled to capture time, and the photo shown was already decoded
+        photos = {}
+        if self.wgtFisheye.myPhotoBuffer is not None:
+            photos[self.wgtFisheye.myPhotoPath] = self.wgtFisheye.myPhotoBuffer.pixels
+        count, error = utility_export.exportCapture(common.AppSettings["DataDirectory"], fileout, xoptions, self.capture, samples, common.Exposures[self.exposure], self.captureTimeASDFiles, photos, self.exportDataset)
+        if len(error) > 0:
+            self.log(error)
             return
 
-        # compute sun position
-        spa = utility_data.deepcopySPAData(common.SPASiteData)
-        if message == 'convert':
-            utility_data.fillSPADateTime(spa, capture)
-        sunpos = utility_data.computeSunPosition(spa)
-
-        # compute locations in photo to sample from
-        # NOTE: assumes same positions for all files! (speed up) could be recomputed per file
-        filesamplepoints = utility_data.computePointsInImage(expphotos[0], common.SamplingPattern)
-        points = [filesamplepoints[i] for i in samples]
-        coords = [common.SamplingPattern[i] for i in samples]  # sample coordinates
-
-        # determine pixel regions and weighting
-        pixweight = common.PixelWeighting(xoptions["PixelWeighting"])
-        pixregions = []
-        if xoptions["ComputePixelRegion"]:
-            pixregions = [common.AltitudeRegionMap[c[1]] for c in coords]
-        else:
-            reg = xoptions["PixelRegion"]
-            pixregions = [reg for i in range(0, len(points))]
-
-        # compute pixels
-        exppixels = []  # list of lists of pixels per exposure
-        for i in range(0, len(exposures)):
-            exppixels.append(utility_data.collectPixels(points, pixregions, file=expphotos[i], weighting=pixweight))
-
-        # modify pixels per color model
-        color = common.ColorModel(xoptions["ColorModel"])
-        if color == common.ColorModel.HSV:
-            for pixels in exppixels:
-                for i in range(0, len(samples)):
-                    rgb = sRGBColor(pixels[i][0], pixels[i][1], pixels[i][2], is_upscaled=True)
-                    hsv = convert_color(rgb, HSVColor)
-                    pixels[i] = hsv.get_value_tuple()
-        elif color == common.ColorModel.HSL:
-            for pixels in exppixels:
-                for i in range(0, len(samples)):
-                    rgb = sRGBColor(pixels[i][0], pixels[i][1], pixels[i][2], is_upscaled=True)
-                    hsl = convert_color(rgb, HSLColor)
-                    pixels[i] = hsl.get_value_tuple()
-        elif color == common.ColorModel.LAB:
-            for pixels in exppixels:
-                for i in range(0, len(samples)):
-                    rgb = sRGBColor(pixels[i][0], pixels[i][1], pixels[i][2], is_upscaled=True)
-                    lab = convert_color(rgb, LabColor)
-                    pixels[i] = lab.get_value_tuple()
-
-        # modify coordinates per coordinate system
-        coordsys = common.CoordSystem(xoptions["CoordSystem"])
-        if coordsys == common.CoordSystem.Polar:
-            coordsfinal = coords
-            sunposfinal = sunpos
-        elif coordsys == common.CoordSystem.PolarNorm:
-            coordsfinal = [(c[0]/360.0, c[1]/90.0) for c in coords]
-            sunposfinal = (sunpos[0]/360.0, sunpos[1]/90.0)
-        elif coordsys == common.CoordSystem.UV:
-            coordsfinal = [(utility_angles.SkyCoord2FisheyeUV(c[0], c[1])) for c in coords]
-            sunposfinal = (utility_angles.SkyCoord2FisheyeUV(sunpos[0], sunpos[1]))
-        if message != 'convert':
-            self.log("Exporting... ")
+        self.log("Exported " + str(count) + " sample(s) of capture " + str(self.capture))
 
-        # init
-        sampleidx = 0
-        delimiter = ","
-        speccount = xoptions["SpectrumEnd"] - xoptions["SpectrumStart"] + 1
-        resolution = xoptions["SpectrumResolution"]
-        skycover = utility_data.findCaptureSkyCover(capture, common.SkyCoverData)
-
-        # create file if not exists
-        if not os.path.exists(fileout):
-            # create dirs if not exists
-            if not os.path.exists(os.path.dirname(fileout)):
-                os.makedirs(os.path.dirname(fileout))
-            # write header
-            with open(fileout, "w") as file:
-                for fidx in xoptions["Features"]:
-                    feature = DialogExport.attributeFromIndex(fidx)
-                    if feature == "Exposure":
-                        if xoptions["IsHDR"]:
-                            for j in range(0, len(common.Exposures)):
-                                file.write("Exposure" + str(j+1) + delimiter)
-                        else:
-                            file.write("Exposure" + delimiter)
-                    elif feature == "PixelColor":
-                        if xoptions["IsHDR"]:
-                            for j in range(0, len(common.Exposures)):
-                                file.write("ColorA" + str(j+1) + delimiter + "ColorB" + str(j+1) + delimiter + "ColorC" + str(j+1) + delimiter)
-                        else:
-                            file.write("ColorA" + delimiter + "ColorB" + delimiter + "ColorC" + delimiter)
-                    elif feature == "Radiance":
-                        file.write(str(xoptions["SpectrumStart"]))  # first wavelength, no delimiter
-                        for w in range(xoptions["SpectrumStart"] + resolution, xoptions["SpectrumEnd"] + 1, resolution):
-                            file.write(delimiter + str(w))  # delimiter plus next wavelength
-                    else:
-                        file.write(feature)
-                        file.write(delimiter)
-                file.write("\n")
-        # otherwise count existing samples
-        else:
-            with open(fileout, 'r') as file:
-                reader = csv.reader(file, delimiter=',')
-                next(reader, None) # skip header
-                sampleidx = sum(1 for row in reader)
-
-        # append export to existing file
-        with open(fileout, "a") as file:
-            # export each selected sample
-            for i, sIdx in enumerate(samples):
-
-                # export each required attribute
-                # date
-                file.write(str(capture.date()))
-                file.write(delimiter)
-                # time
-                file.write(str(capture.time()))
-                file.write(delimiter)
-                # space
-                file.write(str(coordsys.value))
-                file.write(delimiter)
-
-                # export each optional attribute
-                for aIdx in xoptions["Features"]:
-                    feature = common.SampleFeatures[aIdx][0]
-
-                    # export sun azimuth
-                    if feature == "SunAzimuth":
-                        file.write('{0:.4f}'.format(sunposfinal[0]))
-                        file.write(delimiter)
-                    # export sun altitude
-                    elif feature == "SunAltitude":
-                        file.write('{0:.4f}'.format(sunposfinal[1]))
-                        file.write(delimiter)
-                    # export sky cover
-                    elif feature == "SkyCover":
-                        file.write(str(skycover.value))
-                        file.write(delimiter)
-                    # export index
-                    elif feature == "SamplePatternIndex":
-                        file.write(str(sIdx))
-                        file.write(delimiter)
-                    # export sample azimuth
-                    elif feature == "SampleAzimuth":
-                        file.write('{0:.4f}'.format(coordsfinal[i][0]))
-                        file.write(delimiter)
-                    # export sample altitude
-                    elif feature == "SampleAltitude":
-                        file.write('{0:.4f}'.format(coordsfinal[i][1]))
-                        file.write(delimiter)
-                    # export sun point/sample angle
-                    elif feature == "SunPointAngle":
-                        angle = utility_angles.CentralAngle(sunpos, coords[i])
-                        angle = math.degrees(angle)
-                        file.write('{0:.3f}'.format(angle))
-                        file.write(delimiter)
-                    # export pixel neighborhood
-                    elif (feature == "PixelRegion"):
-                        file.write(str(pixregions[i]))
-                        file.write(delimiter)
-                    # export pixel weighting method
-                    elif feature == "PixelWeighting":
-                        file.write(str(pixweight.value))
-                        file.write(delimiter)
-                    # export pixel color model
-                    elif feature == "ColorModel":
-                        file.write(str(color.value))
-                        file.write(delimiter)
-                    # export photo exposure time(s)
-                    elif feature == "Exposure":
-                        for exp in exposures:
-                            file.write(str(exp))
-                            file.write(delimiter)
-                    # export sample pixel color(s)
-                    elif feature == "PixelColor":
-                        for pixels in exppixels:
-                            file.write(str(pixels[i][0]))  # color component 1
-                            file.write(delimiter)
-                            file.write(str(pixels[i][1]))  # color component 2
-                            file.write(delimiter)
-                            file.write(str(pixels[i][2]))  # color component 3
-                            file.write(delimiter)
-                    # export spectral radiance
-                    elif feature == "Radiance":
-                        xs, ys = utility_data.loadASDFile(asdfiles[sIdx])
-                        file.write(str(max(ys[0],0)))  # first wavelength, no delimiter
-                        for j in range(resolution, speccount, resolution):
-                            file.write(delimiter + str(max(ys[j],0)))  # delimiter plus next wavelength
-
-                # next sample
-                file.write("\n")
-                sampleidx += 1
-
-        if message != 'convert':
-            self.log("Exported " + str(len(samples)) + " sample(s) of capture " + str(capture))
+    def closeExportDataset(self):
+        if self.exportDataset is not None:
+            self.exportDataset.close()
+            self.exportDataset = None
 
     def convertSamples(self):
         dialog = DialogConverter()
@@ -928,17 +723,12 @@ class SpectralSkyViewer(QMainWindow):
 
         # init
         count = 0
-        currtime = datetime.min
-        extra = {
-            "DatasetOut": dialog.datasetOut,
-            "SamplesSelected": [],
-            "Capture": datetime.min,
-            "Exposure": 0
-        }
+        jobs = []  # (capture, samples, exposure) of each capture to convert
+        exposure = common.Exposures[self.exposure] if self.exposure > -1 else common.Exposures[0]
 
         # if output file exists - wipe it out, all of it
-        if os.path.exists(dialog.datasetOut):
-            os.unlink(dialog.datasetOut)
+        self.closeExportDataset()
+        utility_export.removeDataset(dialog.datasetOut)
 
         self.log("Converting... ")
         with open(dialog.datasetIn, 'r') as filein:
@@ -946,29 +736,23 @@ class SpectralSkyViewer(QMainWindow):
             # read header
             header = next(reader, None)
             mapping = {header[i]: i for i in range(0, len(header))}
-            # read first row
-            row = next(reader, None)
-            currtime = datetime.strptime(row[mapping['Date']] + ' ' + row[mapping['Time']], "%m/%d/%Y %H:%M:%S")
-            # reset reader
-            filein.seek(0)
-            next(reader, None)  # skip header this time
             # read each row/sample
             for row in reader:
                 ts = datetime.strptime(row[mapping['Date']] + ' ' + row[mapping['Time']], "%m/%d/%Y %H:%M:%S")
-                # new capture timestamp of samples? flush current samples
-                if ts != currtime:
-                    self.exportSamples('convert', extra)
-                    currtime = ts
-                    extra["SamplesSelected"] = []
+                # new capture timestamp of samples? start a new job
+                if len(jobs) <= 0 or ts != jobs[-1][0]:
+                    jobs.append((ts, [], exposure))
                 # collect samples to convert
                 count += 1
-                extra["SamplesSelected"].append(int(row[mapping["SamplePatternIndex"]]))
-                extra["Capture"] = ts
-                if "Exposure" in header:
-                    extra["Exposure"] = float(row[mapping["Exposure"]])
-            # flush any remaining samples
-            if len(extra["SamplesSelected"]) > 0:
-                self.exportSamples('convert', extra)
+                jobs[-1][1].append(int(row[mapping["SamplePatternIndex"]]))
+                if "Exposure" in header and float(row[mapping["Exposure"]]) > 0:
+                    jobs[-1] = (ts, jobs[-1][1], float(row[mapping["Exposure"]]))
+
+        # export all captures in parallel
+        def progress(i, total, capture, exported, error):
+            if len(error) > 0:
+                self.log(error)
+        utility_export.exportCaptures(common.AppSettings["DataDirectory"], dialog.datasetOut, common.AppSettings["ExportOptions"], jobs, common.AppSettings["ExportProcesses"], progress)
         self.log("Converted " + str(count) + " sample(s)")
 
     def setupExportFile(self):
@@ -977,7 +761,8 @@ class SpectralSkyViewer(QMainWindow):
         if code != QDialog.Accepted:
             return
 
-        # save the export options in app settings
+        # save the export options in app settings (samples exported so far were exported with the old ones)
+        self.closeExportDataset()
         common.AppSettings.update({"ExportOptions": dialog.exportOptions})
 
         # now that export options are configured, enable export and convert commands
@@ -1035,16 +820,22 @@ class SpectralSkyViewer(QMainWindow):
             common.AppSettings["ShowMask"] = state
         elif action == self.actUVGrid:
             common.AppSettings["ShowUVGrid"] = state
+            self.wgtFisheye.invalidateLayers(ViewFisheye.Layer.Grid)
         elif action == self.actCompass:
             common.AppSettings["ShowCompass"] = state
+            self.wgtFisheye.invalidateLayers(ViewFisheye.Layer.Compass)
         elif action == self.actLensWarp:
             common.AppSettings["ShowLensWarp"] = state
+            self.wgtFisheye.invalidateLayers(ViewFisheye.Layer.LensWarp)
         elif action == self.actSunPath:
             common.AppSettings["ShowSunPath"] = state
+            self.wgtFisheye.invalidateLayers(ViewFisheye.Layer.SunPath)
         elif action == self.actSamples:
             common.AppSettings["ShowSamples"] = state
+            self.wgtFisheye.invalidateLayers(ViewFisheye.Layer.Samples)
         elif action == self.actShadows:
             common.AppSettings["ShowShadows"] = state
+            self.wgtFisheye.invalidateLayers(ViewFisheye.Layer.Compass, ViewFisheye.Layer.SunPath, ViewFisheye.Layer.Selected)
 
         self.wgtFisheye.repaint()
 
@@ -1113,6 +904,16 @@ class SpectralSkyViewer(QMainWindow):
     def toggleAbout(self, state):
         self.dontSaveSettings = state
 
+    def toggleCaches(self):
+        caches = [("Photos", utility_photo.PhotoCache, True),
+                  ("Photo Pixels", utility_data.PixelCache, True),
+                  ("Image Info", utility_data.ImageInfoCache, False),
+                  ("Image Points", utility_data.PointsCache, False),
+                  ("Spectra", utility_spectra.SpectrumCache, True)]
+        dialog = DialogDebug(self, caches)
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.show()
+
     def center(self):
         frame = self.frameGeometry()
         centerPoint = QDesktopWidget().availableGeometry().center()
@@ -1128,6 +929,8 @@ class SpectralSkyViewer(QMainWindow):
         # btn.clicked.connect(QApplication.instance().quit)
         event.accept()
 
+        self.closeExportDataset()
+
         if self.dontSaveSettings:
             return
 
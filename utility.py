@@ -11,8 +11,9 @@ import subprocess
 import shlex
 import re
 import logging
+from collections import OrderedDict
 from datetime import datetime
-from threading import Timer
+from threading import Timer, RLock
 
 
 '''
@@ -188,3 +189,79 @@ def runCMD(cmd, timeout_sec):
     stdout, stderr = process.communicate()
     timer.cancel()
     return process.returncode, stdout, stderr, timeout["value"]
+
+'''
+A least-recently-used cache with a memory budget. Least recently used entries are evicted once over budget.
+:param budget: Max total size of cached values (in bytes).
+:param sizeof: Function that returns the size (in bytes) of a cached value.
+:note: Thread safe. Hit, miss and eviction counters are kept for profiling.
+'''
+class LRUCache:
+
+    def __init__(self, budget, sizeof=lambda value: 1):
+        self.budget = budget
+        self.sizeof = sizeof
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = RLock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key, None)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            # values larger than the entire budget are never cached
+            if size > self.budget:
+                return
+            self.entries[key] = (value, size)
+            self.size += size
+            self.evict()
+
+    def pop(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return None
+            self.size -= entry[1]
+            return entry[0]
+
+    def resize(self, budget):
+        with self.lock:
+            self.budget = budget
+            self.evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def evict(self):
+        while self.size > self.budget and len(self.entries) > 0:
+            key, entry = self.entries.popitem(last=False)
+            self.size -= entry[1]
+            self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            return {"Entries": len(self.entries), "Size": self.size, "Budget": self.budget,
+                    "Hits": self.hits, "Misses": self.misses, "Evictions": self.evictions}
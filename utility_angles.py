@@ -24,73 +24,96 @@ import common
 
 
 '''
-Convert a sky coordinate (azimuth, altitude) to fisheye UV coordinate (0-1, 0-1).
+Convert sky coordinates (azimuths, altitudes) to fisheye UV coordinates (0-1, 0-1), for whole arrays at once.
 Note that images in this application were taken with North facing downward, so we must account for this in UV.
 Note sampling pattern coordinates in this application were measured in altitude, but calculation below requires zenith.
 Note altering of zenith to account for warp of lens used:
 http://paulbourke.net/dome/fisheyecorrect/
+:param azimuths: Array-like of azimuths (degrees).
+:param altitudes: Array-like of altitudes (degrees), same shape as azimuths.
+:return: 2 numpy arrays, Us and Vs.
 '''
-def SkyCoord2FisheyeUV(azimuth, altitude, lenswarp=True):
+def SkyCoords2FisheyeUVs(azimuths, altitudes, lenswarp=True):
+    azimuths = np.asarray(azimuths, dtype=np.float64)
+    altitudes = np.asarray(altitudes, dtype=np.float64)
+
     # 1) sky photos were saved as (North down, South up), so rotate "North" to polar coordinate system (0 deg East)
     # 2) inverse azimuth because photos are taken from inside skydome, so east and west are flipped!
-    azimuth = 360 - ((azimuth + 270) % 360)
+    azimuths = 360 - ((azimuths + 270) % 360)
 
     # convert altitude to zenith
-    zenith = (90 - altitude)
+    zeniths = (90 - altitudes)
 
     # convert from angles to radians
-    azimuth = azimuth * math.pi / 180.0
-    zenith = zenith * math.pi / 180.0
+    azimuths = azimuths * math.pi / 180.0
+    zeniths = zeniths * math.pi / 180.0
 
-    # compute radius
+    # compute radii (lens polynomial evaluated once for the whole batch)
     # account for non-linearity/warp of actual lens
     if lenswarp and len(common.LensWarp) > 0:
-        radius = np.polyval(common.LensWarp, zenith)
+        radii = np.polyval(common.LensWarp, zeniths)
     # use ideal lens
     else:
-        radius = np.polyval(common.LensIdeal, zenith)
+        radii = np.polyval(common.LensIdeal, zeniths)
 
     # compute UVs
-    u = radius * math.cos(azimuth)
-    v = radius * math.sin(azimuth)
+    us = radii * np.cos(azimuths)
+    vs = radii * np.sin(azimuths)
 
     # adjust to [0, 1] range
-    u = 0.5 * u + 0.5
-    v = 0.5 * v + 0.5
+    us = 0.5 * us + 0.5
+    vs = 0.5 * vs + 0.5
 
-    return u, v
+    return us, vs
 
 '''
-Convert a fisheye UV coordinate (0-1, 0-1) to a sky coordinate (azimuth, altitude).
+Convert a sky coordinate (azimuth, altitude) to fisheye UV coordinate (0-1, 0-1).
 '''
-def FisheyeUV2SkyCoord(u, v, lenswarp=True):
+def SkyCoord2FisheyeUV(azimuth, altitude, lenswarp=True):
+    u, v = SkyCoords2FisheyeUVs(azimuth, altitude, lenswarp)
+    return float(u), float(v)
+
+'''
+Convert fisheye UV coordinates (0-1, 0-1) to sky coordinates (azimuths, altitudes), for whole arrays at once.
+:param us: Array-like of U coordinates.
+:param vs: Array-like of V coordinates, same shape as us.
+:return: 2 numpy arrays, azimuths and altitudes (degrees).
+'''
+def FisheyeUVs2SkyCoords(us, vs, lenswarp=True):
     # adjust to [-1, 1] range
-    u = (u - 0.5) * 2
-    v = (v - 0.5) * 2
+    us = (np.asarray(us, dtype=np.float64) - 0.5) * 2
+    vs = (np.asarray(vs, dtype=np.float64) - 0.5) * 2
 
-    radius = math.sqrt((u * u) + (v * v))
+    radii = np.sqrt((us * us) + (vs * vs))
 
     # compute azimuth
-    azimuth = math.atan2(u, v)
+    azimuths = np.arctan2(us, vs)
     # rotate azimuth so that position of North is pointing directly down
-    azimuth = (azimuth + 2*math.pi) % (2*math.pi)
+    azimuths = (azimuths + 2*math.pi) % (2*math.pi)
 
-    # compute zenith
+    # compute zenith (lens polynomial evaluated once for the whole batch)
     # account for non-linearity/warp of actual lens
     if lenswarp and len(common.LensWarpInv) > 0:
-        zenith = np.polyval(common.LensWarpInv, radius)
+        zeniths = np.polyval(common.LensWarpInv, radii)
     # use ideal lens
     else:
-        zenith = np.polyval(common.LensIdealInv, radius)
+        zeniths = np.polyval(common.LensIdealInv, radii)
 
     # convert zenith to altitude
-    altitude = (math.pi / 2) - zenith
+    altitudes = (math.pi / 2) - zeniths
 
     # convert from radians to angles
-    azimuth = azimuth * 180.0 / math.pi
-    altitude = altitude * 180.0 / math.pi
+    azimuths = azimuths * 180.0 / math.pi
+    altitudes = altitudes * 180.0 / math.pi
+
+    return azimuths, altitudes
 
-    return azimuth, altitude
+'''
+Convert a fisheye UV coordinate (0-1, 0-1) to a sky coordinate (azimuth, altitude).
+'''
+def FisheyeUV2SkyCoord(u, v, lenswarp=True):
+    azimuth, altitude = FisheyeUVs2SkyCoords(u, v, lenswarp)
+    return float(azimuth), float(altitude)
 
 '''
 Convert an image pixel coordinate to a fisheye UV coordinate (0-1, 0-1).
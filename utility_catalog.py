@@ -0,0 +1,312 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# ====================================================================
+# @author: Joe Del Rocco
+# @since: 10/17/2026
+# @summary: A module that indexes the data directory so capture lookups don't re-walk folders.
+# ====================================================================
+import os
+import sqlite3
+import threading
+from datetime import datetime
+import common
+import utility
+import utility_correlation
+
+
+CatalogFilename = "catalog.db"  # index file stored in root of data directory
+CatalogVersion = 2              # bump this whenever the schema or scan rules change
+CatalogKinds = ("HDR", "ASD")   # capture folders found under each date folder
+Catalogs = {}                   # in-memory catalogs per data directory (loaded/validated lazily)
+CatalogLock = threading.RLock() # catalogs are also looked up from background (prefetch) threads
+
+
+# - catalog -------------------------------------------------------------------
+# - catalog -------------------------------------------------------------------
+# - catalog -------------------------------------------------------------------
+
+'''
+Function to load (or create) the catalog of a data directory.
+The root listing of capture dates is validated against the data directory modification time.
+Each capture date is validated against its folder modification times the first time it is accessed.
+:param datadir: The data directory to index.
+:param reload: Force re-validation of all capture dates, even if they were already validated this session.
+:return: The in-memory catalog (a dict).
+'''
+def loadCatalog(datadir, reload=False):
+    with CatalogLock:
+        catalog = Catalogs.get(datadir, None)
+        if catalog is not None:
+            if not reload:
+                return catalog
+            catalog["Connection"].close()
+
+        catalog = {
+            "DataDirectory": datadir,
+            "Connection": openDatabase(datadir),
+            "Dates": {},         # datestr -> date entry (see newDateEntry)
+            "Validated": set(),  # capture dates validated this session
+            "MTime": None,       # data directory modification time at last scan
+        }
+        readDatabase(catalog)
+
+        # rescan list of capture dates if data directory has changed since last time
+        mtime = modTime(datadir)
+        if mtime != catalog["MTime"]:
+            dates = [d for d in listDirs(datadir) if utility.verifyDateTime(d, "%Y-%m-%d")]
+            for datestr in dates:
+                if datestr not in catalog["Dates"]:
+                    catalog["Dates"][datestr] = newDateEntry()
+            for datestr in list(catalog["Dates"].keys()):
+                if datestr not in dates:
+                    del catalog["Dates"][datestr]
+                    deleteDate(catalog, datestr)
+            catalog["MTime"] = mtime
+        writeMeta(catalog)
+
+        Catalogs[datadir] = catalog
+        return catalog
+
+'''
+Function to validate every capture date of a data directory at once.
+This is useful for tools that operate on the whole archive rather than a single date.
+:param datadir: The data directory to index.
+:return: The in-memory catalog (a dict).
+'''
+def scanCatalog(datadir):
+    catalog = loadCatalog(datadir)
+    for datestr in sorted(catalog["Dates"].keys()):
+        validateDate(catalog, datestr)
+    return catalog
+
+'''
+Function to validate a capture date against the modification times of its folders.
+Only folders whose modification times have changed are listed again.
+:param catalog: The in-memory catalog.
+:param datestr: The capture date (e.g. "2012-11-06").
+:return: The date entry, or None if capture date is not in the data directory.
+'''
+def validateDate(catalog, datestr):
+    with CatalogLock:
+        entry = catalog["Dates"].get(datestr, None)
+        if entry is None:
+            return None
+        if datestr in catalog["Validated"]:
+            return entry
+
+        changed = False
+        pathDate = os.path.join(catalog["DataDirectory"], datestr)
+        for kind in CatalogKinds:
+            pathKind = os.path.join(pathDate, kind)
+            folder = entry[kind]
+
+            # capture time folders were added or removed
+            mtime = modTime(pathKind)
+            if mtime != folder["MTime"]:
+                times = [t for t in listDirs(pathKind) if utility.verifyDateTime(t, "%H.%M.%S")]
+                folder["Captures"] = {t: folder["Captures"].get(t, {"MTime": None, "Files": []}) for t in sorted(times)}
+                folder["MTime"] = mtime
+                changed = True
+
+            # files were added or removed from a capture time folder
+            for timestr, capture in folder["Captures"].items():
+                mtime = modTime(os.path.join(pathKind, timestr))
+                if mtime != capture["MTime"]:
+                    capture["Files"] = sorted(listFiles(os.path.join(pathKind, timestr)))
+                    capture["MTime"] = mtime
+                    changed = True
+
+        # correlate HDR and ASD captures
+        if changed or entry["Correlations"] is None:
+            entry["Correlations"] = correlateDate(datestr, entry)
+            changed = True
+
+        if changed:
+            writeDate(catalog, datestr)
+        catalog["Validated"].add(datestr)
+        return entry
+
+'''
+Function to correlate each HDR capture of a date to its nearest ASD capture within capture epsilon.
+:param datestr: The capture date (e.g. "2012-11-06").
+:param entry: The date entry.
+:return: A dict of HDR capture time -> ASD capture time.
+'''
+def correlateDate(datestr, entry):
+    return utility_correlation.correlateDay(entry["HDR"]["Captures"].keys(), entry["ASD"]["Captures"].keys(), common.CaptureEpsilon)
+
+def newDateEntry():
+    return {
+        "HDR": {"MTime": None, "Captures": {}},  # timestr -> {"MTime", "Files"}
+        "ASD": {"MTime": None, "Captures": {}},  # timestr -> {"MTime", "Files"}
+        "Correlations": None,                    # HDR timestr -> ASD timestr
+    }
+
+def modTime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return -1
+
+def listDirs(path):
+    try:
+        return [e.name for e in os.scandir(path) if e.is_dir()]
+    except OSError:
+        return []
+
+def listFiles(path):
+    try:
+        return [e.name for e in os.scandir(path) if e.is_file()]
+    except OSError:
+        return []
+
+# - lookups -------------------------------------------------------------------
+# - lookups -------------------------------------------------------------------
+# - lookups -------------------------------------------------------------------
+
+'''
+Function to retrieve all capture dates of a data directory.
+:param datadir: The data directory to search in.
+:return: A sorted list of capture date strings (e.g. "2012-11-06").
+'''
+def findCaptureDates(datadir):
+    catalog = loadCatalog(datadir)
+    return sorted(catalog["Dates"].keys())
+
+'''
+Function to retrieve all HDR capture times of a capture date.
+:param datadir: The data directory to search in.
+:param datestr: The capture date (e.g. "2012-11-06").
+:return: A sorted list of capture time strings (e.g. "08.57.23").
+'''
+def findCaptureTimes(datadir, datestr):
+    entry = validateDate(loadCatalog(datadir), datestr)
+    if entry is None:
+        return []
+    return list(entry["HDR"]["Captures"].keys())
+
+'''
+Function to retrieve the filepaths of all exposure photos of an HDR capture.
+:param datadir: The data directory to search in.
+:param capture: The (datetime) capture timestamp.
+:param extension: The extension of the photos (e.g. "jpg").
+:return: A sorted list of filepaths.
+'''
+def findCapturePhotos(datadir, capture, extension):
+    datestr = datetime.strftime(capture, "%Y-%m-%d")
+    timestr = datetime.strftime(capture, "%H.%M.%S")
+    return findCaptureFiles(datadir, datestr, "HDR", timestr, extension)
+
+'''
+Function to retrieve the ASD capture time correlated with an HDR capture.
+:param datadir: The data directory to search in.
+:param capture: The (datetime) HDR capture timestamp.
+:return: The ASD capture time string (e.g. "08.57.41"), or an empty string if none correlated.
+'''
+def findASDCapture(datadir, capture):
+    datestr = datetime.strftime(capture, "%Y-%m-%d")
+    timestr = datetime.strftime(capture, "%H.%M.%S")
+    entry = validateDate(loadCatalog(datadir), datestr)
+    if entry is None:
+        return ''
+    return entry["Correlations"].get(timestr, '')
+
+'''
+Function to retrieve the filepaths of the ASD files correlated with an HDR capture.
+:param datadir: The data directory to search in.
+:param capture: The (datetime) HDR capture timestamp.
+:param extension: The extension of the ASD files.
+:return: A sorted list of filepaths.
+'''
+def findASDFiles(datadir, capture, extension="txt"):
+    asdstr = findASDCapture(datadir, capture)
+    if len(asdstr) <= 0:
+        return []
+    return findCaptureFiles(datadir, datetime.strftime(capture, "%Y-%m-%d"), "ASD", asdstr, extension)
+
+def findCaptureFiles(datadir, datestr, kind, timestr, extension):
+    entry = validateDate(loadCatalog(datadir), datestr)
+    if entry is None or timestr not in entry[kind]["Captures"]:
+        return []
+    extension = extension.strip().lower()
+    if extension[0] != ".":
+        extension = "." + extension
+    pathCapture = os.path.join(datadir, datestr, kind, timestr)
+    files = entry[kind]["Captures"][timestr]["Files"]
+    return [os.path.join(pathCapture, f) for f in files if os.path.splitext(f.lower())[1] == extension]
+
+# - database ------------------------------------------------------------------
+# - database ------------------------------------------------------------------
+# - database ------------------------------------------------------------------
+
+'''
+Function to open the catalog database of a data directory.
+:note: If the data directory is read-only, an in-memory database is used instead (nothing is persisted).
+'''
+def openDatabase(datadir):
+    try:
+        conn = sqlite3.connect(os.path.join(datadir, CatalogFilename), check_same_thread=False)
+        createTables(conn)
+    except sqlite3.Error:
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        createTables(conn)
+    return conn
+
+def createTables(conn):
+    with conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS dates (date TEXT PRIMARY KEY, epsilon REAL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS dirs (date TEXT, kind TEXT, time TEXT, mtime REAL, PRIMARY KEY (date, kind, time))")
+        conn.execute("CREATE TABLE IF NOT EXISTS files (date TEXT, kind TEXT, time TEXT, name TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS correlations (date TEXT, hdrtime TEXT, asdtime TEXT, PRIMARY KEY (date, hdrtime))")
+        conn.execute("CREATE INDEX IF NOT EXISTS files_capture ON files (date, kind, time)")
+    # an index from an older version of this program can't be trusted, start over
+    row = conn.execute("SELECT value FROM meta WHERE key='version'").fetchone()
+    if row is None or int(row[0]) != CatalogVersion:
+        with conn:
+            for table in ["meta", "dates", "dirs", "files", "correlations"]:
+                conn.execute("DELETE FROM " + table)
+            conn.execute("INSERT INTO meta VALUES ('version', ?)", (str(CatalogVersion),))
+
+def readDatabase(catalog):
+    conn = catalog["Connection"]
+    meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+    catalog["MTime"] = float(meta["mtime"]) if "mtime" in meta else None
+
+    # stored correlations are only valid if capture epsilon hasn't changed since
+    dates = catalog["Dates"]
+    for datestr, epsilon in conn.execute("SELECT date, epsilon FROM dates"):
+        entry = dates.setdefault(datestr, newDateEntry())
+        entry["Correlations"] = {} if epsilon == common.CaptureEpsilon else None
+    for datestr, kind, timestr, mtime in conn.execute("SELECT date, kind, time, mtime FROM dirs ORDER BY date, kind, time"):
+        entry = dates.setdefault(datestr, newDateEntry())
+        if len(timestr) <= 0:
+            entry[kind]["MTime"] = mtime
+        else:
+            entry[kind]["Captures"][timestr] = {"MTime": mtime, "Files": []}
+    for datestr, kind, timestr, name in conn.execute("SELECT date, kind, time, name FROM files ORDER BY date, kind, time, name"):
+        dates[datestr][kind]["Captures"][timestr]["Files"].append(name)
+    for datestr, hdrstr, asdstr in conn.execute("SELECT date, hdrtime, asdtime FROM correlations"):
+        if dates[datestr]["Correlations"] is not None:
+            dates[datestr]["Correlations"][hdrstr] = asdstr
+
+def writeMeta(catalog):
+    with catalog["Connection"] as conn:
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('mtime', ?)", (str(catalog["MTime"]),))
+
+def writeDate(catalog, datestr):
+    entry = catalog["Dates"][datestr]
+    deleteDate(catalog, datestr)
+    with catalog["Connection"] as conn:
+        conn.execute("INSERT INTO dates VALUES (?, ?)", (datestr, common.CaptureEpsilon))
+        for kind in CatalogKinds:
+            conn.execute("INSERT INTO dirs VALUES (?, ?, '', ?)", (datestr, kind, entry[kind]["MTime"]))
+            for timestr, capture in entry[kind]["Captures"].items():
+                conn.execute("INSERT INTO dirs VALUES (?, ?, ?, ?)", (datestr, kind, timestr, capture["MTime"]))
+                conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?)", [(datestr, kind, timestr, f) for f in capture["Files"]])
+        conn.executemany("INSERT INTO correlations VALUES (?, ?, ?)", [(datestr, h, a) for h, a in entry["Correlations"].items()])
+
+def deleteDate(catalog, datestr):
+    with catalog["Connection"] as conn:
+        for table in ["dates", "dirs", "files", "correlations"]:
+            conn.execute("DELETE FROM " + table + " WHERE date=?", (datestr,))
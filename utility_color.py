@@ -0,0 +1,112 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# ====================================================================
+# @author: Joe Del Rocco
+# @since: 10/17/2026
+# @summary: A module with color model conversions of whole arrays of pixels at once.
+# @note: Conversions follow colormath 3.0.0 (sRGB companding, D65 2 degree illuminant). HSV and HSL exports are identical,
+#        L*a*b* ones differ by up to ~1e-13 (numpy pow rounding), so their last printed digit may differ.
+# ====================================================================
+import numpy as np
+import common
+
+
+# sRGB (D65) linear RGB -> XYZ matrix, as in colormath
+SRGBMatrix = np.array([
+    [0.412424, 0.357579, 0.180464],
+    [0.212656, 0.715158, 0.0721856],
+    [0.0193324, 0.119193, 0.950444]])
+WhiteD65 = np.array([0.95047, 1.00000, 1.08883])  # XYZ of D65 (2 degree observer)
+CIE_E = 216.0 / 24389.0
+
+
+'''
+Function to scale pixels to color components of range 0-1.
+:param pixels: Array-like (N x 3 or more) of RGB(A) pixels of range 0-255.
+:return: 3 numpy arrays, Rs, Gs and Bs (alpha is ignored).
+'''
+def scaleRGB(pixels):
+    rgb = np.asarray(pixels, dtype=np.float64).reshape(-1, np.shape(pixels)[-1])
+    rgb = rgb[:, 0:3] / 255.0
+    return rgb[:,0], rgb[:,1], rgb[:,2]
+
+'''
+Function to compute the hue of pixels, the same way for HSV and HSL.
+:return: Numpy array of hues (degrees 0-360).
+'''
+def hue(r, g, b, cmin, cmax):
+    delta = cmax - cmin
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hues = np.select(
+            [delta == 0, cmax == r, cmax == g],
+            [0.0, (60.0 * ((g - b) / delta) + 360) % 360.0, 60.0 * ((b - r) / delta) + 120],
+            60.0 * ((r - g) / delta) + 240.0)
+    return hues
+
+'''
+Function to convert RGB pixels to HSV.
+:param pixels: Array-like (N x 3 or more) of RGB(A) pixels of range 0-255.
+:return: A (N x 3) numpy array of H (degrees 0-360), S (0-1) and V (0-1).
+'''
+def RGB2HSV(pixels):
+    r, g, b = scaleRGB(pixels)
+    cmax = np.maximum(np.maximum(r, g), b)
+    cmin = np.minimum(np.minimum(r, g), b)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(cmax == 0, 0.0, 1.0 - (cmin / cmax))
+    return np.stack([hue(r, g, b, cmin, cmax), s, cmax], axis=1)
+
+'''
+Function to convert RGB pixels to HSL.
+:param pixels: Array-like (N x 3 or more) of RGB(A) pixels of range 0-255.
+:return: A (N x 3) numpy array of H (degrees 0-360), S (0-1) and L (0-1).
+'''
+def RGB2HSL(pixels):
+    r, g, b = scaleRGB(pixels)
+    cmax = np.maximum(np.maximum(r, g), b)
+    cmin = np.minimum(np.minimum(r, g), b)
+    l = 0.5 * (cmax + cmin)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.select(
+            [cmax == cmin, l <= 0.5],
+            [0.0, (cmax - cmin) / (2.0 * l)],
+            (cmax - cmin) / (2.0 - (2.0 * l)))
+    return np.stack([hue(r, g, b, cmin, cmax), s, l], axis=1)
+
+'''
+Function to convert RGB pixels to CIE XYZ.
+:param pixels: Array-like (N x 3 or more) of sRGB(A) pixels of range 0-255.
+:return: A (N x 3) numpy array of X, Y and Z.
+'''
+def RGB2XYZ(pixels):
+    rgb = np.stack(scaleRGB(pixels), axis=1)
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, np.power((rgb + 0.055) / 1.055, 2.4))  # remove sRGB companding
+    return linear @ SRGBMatrix.T
+
+'''
+Function to convert RGB pixels to CIE L*a*b* (D65).
+:param pixels: Array-like (N x 3 or more) of sRGB(A) pixels of range 0-255.
+:return: A (N x 3) numpy array of L, a and b.
+'''
+def RGB2LAB(pixels):
+    t = RGB2XYZ(pixels) / WhiteD65
+    f = np.where(t > CIE_E, np.power(t, 1.0 / 3.0), (7.787 * t) + (16.0 / 116.0))
+    l = (116.0 * f[:,1]) - 16.0
+    a = 500.0 * (f[:,0] - f[:,1])
+    b = 200.0 * (f[:,1] - f[:,2])
+    return np.stack([l, a, b], axis=1)
+
+'''
+Function to convert RGB pixels to a color model.
+:param pixels: Array-like (N x 3 or more) of RGB(A) pixels of range 0-255.
+:param model: A ColorModel.
+:return: A (N x 3) numpy array of color components (float64, or the RGB components as they are for RGB).
+'''
+def convertColors(pixels, model):
+    if model == common.ColorModel.HSV:
+        return RGB2HSV(pixels)
+    elif model == common.ColorModel.HSL:
+        return RGB2HSL(pixels)
+    elif model == common.ColorModel.LAB:
+        return RGB2LAB(pixels)
+    return np.asarray(pixels).reshape(-1, np.shape(pixels)[-1])[:, 0:3]
@@ -0,0 +1,124 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# ====================================================================
+# @author: Joe Del Rocco
+# @since: 10/17/2026
+# @summary: A module that correlates HDR and ASD captures by their capture timestamps.
+# ====================================================================
+from datetime import datetime
+import numpy as np
+
+
+SecondsPerDay = 86400
+DayStride = SecondsPerDay * 2  # gap between days in archive timestamps, so captures never correlate across dates
+
+
+'''
+Function to parse a capture date folder name (e.g. "2012-11-06") to a day number.
+:param datestr: The capture date string.
+:return: Proleptic Gregorian ordinal of the date, or -1 if not a valid date.
+'''
+def parseDate(datestr):
+    try:
+        return datetime.strptime(datestr, "%Y-%m-%d").toordinal()
+    except ValueError:
+        return -1
+
+'''
+Function to parse capture time folder names (e.g. "08.57.23") to seconds since start of day.
+:param timestrs: A list of capture time strings.
+:return: A numpy int64 array of seconds, with -1 for any string that is not a valid time.
+'''
+def parseTimes(timestrs):
+    seconds = np.full(len(timestrs), -1, dtype=np.int64)
+    for i, t in enumerate(timestrs):
+        toks = t.split('.')
+        if len(toks) != 3 or not all(tok.isdigit() and len(tok) <= 2 for tok in toks):
+            continue
+        h, m, s = int(toks[0]), int(toks[1]), int(toks[2])
+        if h < 24 and m < 60 and s < 62:
+            seconds[i] = h * 3600 + m * 60 + s
+    return seconds
+
+'''
+Function to match each HDR capture to its nearest ASD capture.
+:param hdrSeconds: A numpy array of HDR capture timestamps (in seconds), any order.
+:param asdSeconds: A numpy array of ASD capture timestamps (in seconds), any order.
+:param epsilon: Max acceptable time delta (in seconds) between HDR and ASD captures.
+:return: A numpy int64 array of indices into asdSeconds, one per HDR capture, with -1 where none within epsilon.
+:note: When two ASD captures are equally near, the earlier one wins.
+'''
+def correlate(hdrSeconds, asdSeconds, epsilon):
+    hdrSeconds = np.asarray(hdrSeconds, dtype=np.int64)
+    asdSeconds = np.asarray(asdSeconds, dtype=np.int64)
+    matches = np.full(len(hdrSeconds), -1, dtype=np.int64)
+    if len(hdrSeconds) <= 0 or len(asdSeconds) <= 0:
+        return matches
+
+    # sort ASD timestamps once, then binary search every HDR timestamp at once
+    order = np.argsort(asdSeconds, kind='mergesort')
+    asdSorted = asdSeconds[order]
+    right = np.searchsorted(asdSorted, hdrSeconds, side='left')
+    right = np.clip(right, 0, len(asdSorted) - 1)
+    left = np.clip(right - 1, 0, len(asdSorted) - 1)
+
+    # nearest of the two neighbors
+    dleft = np.abs(hdrSeconds - asdSorted[left])
+    dright = np.abs(asdSorted[right] - hdrSeconds)
+    nearest = np.where(dleft <= dright, left, right)
+    delta = np.minimum(dleft, dright)
+
+    valid = delta <= epsilon
+    matches[valid] = order[nearest[valid]]
+    return matches
+
+'''
+Function to correlate HDR and ASD captures of a single capture date.
+:param hdrTimes: A list of HDR capture time strings (e.g. "08.57.23").
+:param asdTimes: A list of ASD capture time strings.
+:param epsilon: Max acceptable time delta (in seconds) between HDR and ASD captures.
+:return: A dict of HDR capture time string -> ASD capture time string, for HDR captures with a match only.
+'''
+def correlateDay(hdrTimes, asdTimes, epsilon):
+    hdrTimes = list(hdrTimes)
+    asdTimes = list(asdTimes)
+    hdrSeconds = parseTimes(hdrTimes)
+    asdSeconds = parseTimes(asdTimes)
+    # invalid time strings can't match anything
+    asdSeconds[asdSeconds < 0] = -SecondsPerDay
+    matches = correlate(hdrSeconds, asdSeconds, epsilon)
+    return {hdrTimes[i]: asdTimes[j] for i, j in enumerate(matches) if j >= 0 and hdrSeconds[i] >= 0}
+
+'''
+Function to correlate HDR and ASD captures of many capture dates at once.
+:param captures: A dict of date string -> (list of HDR capture time strings, list of ASD capture time strings).
+:param epsilon: Max acceptable time delta (in seconds) between HDR and ASD captures.
+:return: A correlation table, a list of (date string, HDR time string, ASD time string, delta seconds) sorted by capture.
+:note: Captures are only correlated within the same capture date.
+'''
+def correlateArchive(captures, epsilon):
+    hdrKeys, hdrSeconds = [], []
+    asdKeys, asdSeconds = [], []
+    for datestr, (hdrTimes, asdTimes) in captures.items():
+        day = parseDate(datestr)
+        if day < 0:
+            continue
+        hdr = parseTimes(hdrTimes)
+        asd = parseTimes(asdTimes)
+        hdrKeys.extend([(datestr, t) for t, s in zip(hdrTimes, hdr) if s >= 0])
+        asdKeys.extend([t for t, s in zip(asdTimes, asd) if s >= 0])
+        hdrSeconds.append(hdr[hdr >= 0] + day * DayStride)
+        asdSeconds.append(asd[asd >= 0] + day * DayStride)
+    if len(hdrKeys) <= 0 or len(asdKeys) <= 0:
+        return []
+
+    hdrSeconds = np.concatenate(hdrSeconds)
+    asdSeconds = np.concatenate(asdSeconds)
+    matches = correlate(hdrSeconds, asdSeconds, epsilon)
+
+    table = []
+    for i in np.argsort(hdrSeconds, kind='mergesort'):
+        j = matches[i]
+        if j >= 0:
+            table.append((hdrKeys[i][0], hdrKeys[i][1], asdKeys[j], int(abs(hdrSeconds[i] - asdSeconds[j]))))
+    return table
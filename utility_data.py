@@ -8,7 +8,6 @@
 import math
 import os
 import json
-import itertools
 from datetime import datetime
 import numpy as np
 from PIL import Image
@@ -17,9 +16,14 @@ import spa
 import common
 import utility
 import utility_angles
+import utility_catalog
+import utility_spectra
 
 
-GaussianKernels = {}
+GaussianKernels = {}  # 1D (separable) gaussian kernels, built on first use: width -> kernel
+ImageInfoCache = utility.LRUCache(4096)  # image metadata: (path, mtime) -> dict (see imageInfo)
+PointsCache = utility.LRUCache(64)       # points of coordinates in images: (width, height, lens, coords) -> list of (x, y)
+PixelCache = utility.LRUCache(common.DefAppSettings["PixelCacheMB"] * 1048576, lambda p: p[0].nbytes)  # decoded photos: (path, mtime, scale) -> (pixels, decoded scale)
 
 
 # - configuration -------------------------------------------------------------
@@ -36,7 +40,11 @@ def loadAppSettings():
                 common.AppSettings.update({key: loaded[key]})
 
     # validate settings
+    for key in common.DefExportOptions:
+        common.AppSettings["ExportOptions"].setdefault(key, common.DefExportOptions[key])  # options added since settings were saved
     common.AppSettings["ExportOptions"]["Features"].sort()
+    utility_spectra.SpectrumCache.resize(max(common.AppSettings["SpectrumCacheMB"], 0) * 1048576)
+    PixelCache.resize(max(common.AppSettings["PixelCacheMB"], 0) * 1048576)
     if len(common.AppSettings["DataDirectory"]) > 0 and not os.path.exists(common.AppSettings["DataDirectory"]):
         common.AppSettings["DataDirectory"] = ""
         return False
@@ -169,17 +177,10 @@ Function to search for and retrieve the filepath of a capture image.
 :return: A filepath of the specific image.
 '''
 def findHDRFile(datadir, capture, exposure, extension):
-    datestr = datetime.strftime(capture, "%Y-%m-%d")
-    timestr = datetime.strftime(capture, "%H.%M.%S")
     expidx = common.ExposureIdxMap[exposure]
 
-    # find image path of capture timestamp
-    path = os.path.join(datadir, datestr, "HDR", timestr)
-    if not os.path.exists(path):
-        return ''
-
     # gather all exposure photos taken at capture timestamp
-    photos = utility.findFiles(path, mode=1, ext=[extension])
+    photos = utility_catalog.findCapturePhotos(datadir, capture, extension)
     if len(photos) <= 0:
         return ''
 
@@ -191,30 +192,36 @@ def findHDRFile(datadir, capture, exposure, extension):
 
 '''
 Function to compute and retrieve a list of (x, y) points in a specific image given (azimuth, altitude) coordinates.
+Points only depend on image resolution (and lens), so they are computed once per resolution.
 :param imgfile: Filepath to an image.
 :param coords: A list of (azimuth, altitude) coordinates.
+:param size: Optional (width, height) of image, if already known (otherwise read from image header).
 :return: A list of (x, y) points corresponding to the coordinates provided. 
 '''
-def computePointsInImage(imgfile, coords):
-    if not os.path.exists(imgfile) or not coords:
+def computePointsInImage(imgfile, coords, size=None):
+    if not coords:
         return []
+    if size is None:
+        if not os.path.exists(imgfile):
+            return []
+        info = imageInfo(imgfile)
+        size = (info["Width"], info["Height"])
 
-    # load image and retrieve stats
-    image = Image.open(imgfile)
-    center = (int(image.width / 2), int(image.height / 2))
-    diameter = image.height
-    radius = diameter / 2
-    image.close()
+    key = (size[0], size[1], common.LensWarp, tuple(tuple(c) for c in coords))
+    points = PointsCache.get(key)
+    if points is None:
+        center = (int(size[0] / 2), int(size[1] / 2))
+        diameter = size[1]
+        radius = diameter / 2
 
-    # compute each coordinate in the image
-    points = []
-    for c in coords:
-        u, v = utility_angles.SkyCoord2FisheyeUV(c[0], c[1])
-        x = (center[0] - radius) + (u * diameter)
-        y = (center[1] - radius) + (v * diameter)
-        points.append((int(x), int(y)))
+        # compute all coordinates in the image at once
+        us, vs = utility_angles.SkyCoords2FisheyeUVs([c[0] for c in coords], [c[1] for c in coords])
+        xs = ((center[0] - radius) + (us * diameter)).astype(int)
+        ys = ((center[1] - radius) + (vs * diameter)).astype(int)
+        points = list(zip(xs.tolist(), ys.tolist()))
+        PointsCache.put(key, points)
 
-    return points
+    return list(points)
 
 '''
 Function to retrieve the pixels of specific points of an image.
@@ -223,36 +230,181 @@ Function to retrieve the pixels of specific points of an image.
 :param pixels: Optional numpy array of pixels in format [[[R G B (A)]]].
 :param regions: A list of ints for size of (n x n) pixel region/kernel used during pixel convolution.
 :param weighting: Pixel weighting convolution algorithm.
+:param integral: Optional summed-area table of pixels (see integralImage), for mean weighting of any region size in constant time.
 :return: A list of (R,G,B(,A)) tuples representing the pixel colors.
 :note: Length of regions must match length of points.
 :note: Coordinates MUST be within image bounds or this function will throw an exception!
 :note: Alpha component may or may not be included, depending on image format.
 '''
-def collectPixels(points, regions, file='', pixels=None, weighting=common.PixelWeighting.Gaussian):
+def collectPixels(points, regions, file='', pixels=None, weighting=common.PixelWeighting.Gaussian, integral=None):
     if len(regions) != len(points):
         return []
 
     if pixels is None:
-        if not os.path.exists(file) or not points:
+        if not points:
             return []
-        image = Image.open(file)
-        #imgPixels = img.load()
-        pixels = np.array(image)
-        image.close()
-
-    result = []
-    for i, p in enumerate(points):
-        if regions[i] == 1:
-            result.append(pixels[int(p[1]), int(p[0])])
-        else:
-            if weighting == common.PixelWeighting.Mean:
-                result.append(pixelWeightedMean(pixels, p, regions[i]))
+        pixels, scale = loadImagePixels(file)
+        if pixels is None:
+            return []
+
+    if len(points) <= 0:
+        return []
+
+    # a summed-area table is worth building when regions cover more pixels than the image has
+    if integral is None and weighting == common.PixelWeighting.Mean:
+        if sum(r * r for r in regions) > pixels.shape[0] * pixels.shape[1]:
+            integral = integralImage(pixels)
+
+    return list(samplePixels(pixels, points, regions, weighting, integral))
+
+'''
+Function to decode the pixels of an image. Decoded pixels are kept in an LRU cache (keyed by path, modification time and scale),
+so sampling the same photo again (e.g. exporting other samples of a capture) costs no decoding.
+:param file: Path to the image file.
+:param scale: Optional reduction of resolution (1, 2, 4 or 8). JPEGs are decoded at reduced resolution (DCT scaling),
+which is much faster, but pixels are approximate. Other formats are always decoded at full resolution.
+:return: A tuple (read-only numpy array of pixels in format [[[R G B (A)]]], scale it was decoded at), or (None, 1) if file does not exist.
+:note: The decoded scale may be less than asked for (e.g. not a JPEG, or no DCT scaling of that size), 1 is full resolution.
+'''
+def loadImagePixels(file, scale=1):
+    if not os.path.exists(file):
+        return None, 1
+    key = (file, os.path.getmtime(file), scale)
+    decoded = PixelCache.get(key)
+    if decoded is not None:
+        return decoded
+
+    image = Image.open(file)
+    width = image.width
+    if scale > 1 and image.format == "JPEG":
+        image.draft(image.mode, (int(image.width / scale), int(image.height / scale)))
+    #imgPixels = img.load()
+    pixels = np.array(image)
+    image.close()
+    pixels.flags.writeable = False
+    decoded = (pixels, width / pixels.shape[1])
+    PixelCache.put(key, decoded)
+    return decoded
+
+'''
+Function to compute the weighted pixels of many points at once.
+Points are grouped by region size, and each group is weighted in one vectorized pass over its (N x n x n x C) pixel regions.
+Weighting is summed in the same order as pixelWeightedMean and pixelWeightedGaussian, so results are identical to theirs.
+:param pixels: Numpy array of pixels in format [[[R G B (A)]]].
+:param points: A list of (x, y) points.
+:param regions: A list of ints for size of (n x n) pixel region/kernel of each point.
+:param weighting: Pixel weighting convolution algorithm.
+:param integral: Optional summed-area table of pixels (see integralImage), used for mean weighting.
+:return: A (N x C) numpy array of pixel colors.
+'''
+def samplePixels(pixels, points, regions, weighting=common.PixelWeighting.Gaussian, integral=None):
+    points = np.asarray(points).astype(np.int64).reshape(-1, 2)
+    regions = np.asarray(regions, dtype=np.int64)
+    result = np.empty((len(points), pixels.shape[2]), dtype=pixels.dtype)
+    for dim in np.unique(regions).tolist():
+        group = np.nonzero(regions == dim)[0]
+        xs = points[group, 0]
+        ys = points[group, 1]
+        if dim == 1:
+            result[group] = pixels[ys, xs]
+            continue
+
+        # regions that overrun the image are left to the per point functions
+        radius = int(dim / 2)
+        inside = (xs >= radius) & (ys >= radius) & (xs < pixels.shape[1] - radius) & (ys < pixels.shape[0] - radius)
+        for i in group[~inside]:
+            if weighting == common.PixelWeighting.Gaussian:
+                result[i] = pixelWeightedGaussian(pixels, points[i], gaussianKernel(dim))
             elif weighting == common.PixelWeighting.Median:
-                result.append(pixelWeightedMean(pixels, p, regions[i]))
-            elif weighting == common.PixelWeighting.Gaussian:
-                result.append(pixelWeightedGaussian(pixels, p, GaussianKernels[regions[i]]))
+                result[i] = pixelWeightedMedian(pixels, points[i], dim)
+            else:
+                result[i] = pixelWeightedMean(pixels, points[i], dim)
+        group = group[inside]
+        if len(group) <= 0:
+            continue
+
+        if weighting == common.PixelWeighting.Mean and integral is not None:
+            result[group] = integralMeans(integral, points[group, 0], points[group, 1], dim)
+            continue
+
+        patches = pixelRegions(pixels, points[group, 0], points[group, 1], dim)
+        if weighting == common.PixelWeighting.Median:
+            result[group] = medianRegions(patches)
+            continue
+        if weighting == common.PixelWeighting.Gaussian:
+            kernel = gaussianKernel(dim)
+            weighted = np.matmul(kernel, np.matmul(kernel, patches.astype(np.float32)))  # columns, then rows
+        else:
+            weighted = patches * (1.0 / (dim * dim))
+            weighted = weighted.sum(axis=1).sum(axis=1)
+        weighted = np.around(weighted, decimals=1, out=weighted)
+        result[group] = weighted.astype(np.uint8, copy=False)
     return result
 
+'''
+Function to compute the per channel median of many (odd sized) pixel regions at once.
+Regions are odd sized, so the median is the middle value of each channel, which is selected instead of sorted for.
+Large regions of 8-bit pixels select it from a histogram of each channel instead, which is faster than partitioning.
+:param patches: A (N x n x n x C) numpy array of pixel regions.
+:return: A (N x C) numpy array of pixel colors.
+'''
+def medianRegions(patches):
+    count, size, channels = patches.shape[0], patches.shape[1] * patches.shape[2], patches.shape[3]
+    middle = int(size / 2)
+    patches = patches.reshape(count, size, channels)
+    if patches.dtype != np.uint8 or size < 256:
+        return np.partition(patches, middle, axis=1)[:, middle]
+    bins = (np.arange(count * channels).reshape(count, 1, channels) * 256) + patches
+    histograms = np.bincount(bins.ravel(), minlength=count * channels * 256).reshape(count, channels, 256)
+    return np.argmax(np.cumsum(histograms, axis=2) > middle, axis=2).astype(np.uint8)
+
+'''
+Function to compute the summed-area table of an image, with which the sum of any box of pixels takes 4 lookups.
+Sums are unsigned 32 bit, and may wrap around for large images, but box sums that fit in 32 bits are still exact (modular arithmetic).
+:param pixels: Numpy array of pixels in format [[[R G B (A)]]].
+:return: A ((height+1) x (width+1) x C) uint32 numpy array, where [y, x] is the sum of all pixels above and left of (x, y).
+'''
+def integralImage(pixels):
+    integral = np.zeros((pixels.shape[0] + 1, pixels.shape[1] + 1, pixels.shape[2]), dtype=np.uint32)
+    np.cumsum(pixels, axis=0, dtype=np.uint32, out=integral[1:, 1:])
+    np.cumsum(integral[1:, 1:], axis=1, dtype=np.uint32, out=integral[1:, 1:])
+    return integral
+
+'''
+Function to compute the mean of many (n x n) pixel regions from a summed-area table, in constant time per region.
+Results are identical to pixelWeightedMean (box sums are exact, and an odd sized mean is never a rounding tie).
+:param integral: Summed-area table of pixels (see integralImage).
+:param xs: Numpy array of x coordinates (regions must be within image bounds).
+:param ys: Numpy array of y coordinates.
+:param dim: Size of regions.
+:return: A (N x C) numpy array of pixel colors.
+'''
+def integralMeans(integral, xs, ys, dim):
+    radius = int(dim / 2)
+    top, left = ys - radius, xs - radius
+    bottom, right = ys + radius + 1, xs + radius + 1
+    sums = integral[bottom, right] - integral[top, right] - integral[bottom, left] + integral[top, left]
+    means = sums / float(dim * dim)
+    means = np.around(means, decimals=1, out=means)
+    return means.astype(np.uint8, copy=False)
+
+'''
+Function to gather the (n x n) pixel regions centered on many points, without copying the image.
+:param pixels: Numpy array of pixels in format [[[R G B (A)]]].
+:param xs: Numpy array of x coordinates (regions must be within image bounds).
+:param ys: Numpy array of y coordinates.
+:param dim: Size of regions.
+:return: A (N x n x n x C) numpy array of pixel regions.
+'''
+def pixelRegions(pixels, xs, ys, dim):
+    radius = int(dim / 2)
+    strides = pixels.strides
+    windows = np.lib.stride_tricks.as_strided(pixels,
+                                              shape=(pixels.shape[0] - dim + 1, pixels.shape[1] - dim + 1, dim, dim, pixels.shape[2]),
+                                              strides=(strides[0], strides[1], strides[0], strides[1], strides[2]),
+                                              writeable=False)
+    return windows[ys - radius, xs - radius]
+
 def pixelWeightedMean(pixels, coord, dim):
     radius = int(dim / 2)
     scale = 1.0 / (dim * dim)
@@ -269,39 +421,42 @@ def pixelWeightedMean(pixels, coord, dim):
     return pxl
 
 def pixelWeightedMedian(pixels, coord, dim):
-    return None
+    radius = int(dim / 2)
+    pixelset = pixels[coord[1]-radius:coord[1]+radius+1, coord[0]-radius:coord[0]+radius+1]
+    pixelset = pixelset.reshape(-1, pixels.shape[2])
+    if len(pixelset) <= 0:
+        return np.zeros(pixels.shape[2], dtype=np.uint8)
+    pxl = np.median(pixelset, axis=0)
+    pxl = np.around(pxl, decimals=1, out=pxl)
+    pxl = pxl.astype(np.uint8, copy=False)
+    return pxl
 
 def pixelWeightedGaussian(pixels, coord, kernel):
-    radius = int(kernel.shape[1] / 2)
+    radius = int(kernel.shape[0] / 2)
     pixelset = pixels[coord[1]-radius:coord[1]+radius+1, coord[0]-radius:coord[0]+radius+1]
-    pixelset = pixelset * kernel
-    pixelset = np.sum(pixelset, axis=0)
-    pxl = np.sum(pixelset, axis=0)
-    # pxl = np.zeros(pixels.shape[2], np.float32)
-    # for j in range(0, kernel.shape[0]):
-    #     for i in range(0, kernel.shape[1]):
-    #         pxl += kernel[j][i] * pixels[coord[1]+j-radius, coord[0]+i-radius]
+    # separable, so apply 1D kernel across columns and then across rows
+    pixelset = np.matmul(kernel, pixelset.astype(np.float32))
+    pxl = np.matmul(kernel, pixelset)
     pxl = np.around(pxl, decimals=1, out=pxl)
     pxl = pxl.astype(np.uint8, copy=False)
     return pxl
 
+'''
+Function to retrieve the 1D gaussian kernel of a width (built on first use, then cached).
+A 2D gaussian is separable, so the (width x width) kernel is the outer product of this kernel with itself.
+:param width: Width of kernel (odd).
+:return: A normalized numpy float32 array of weights.
+'''
 def gaussianKernel(width):
-    kernel = np.zeros(shape=(width,width,1), dtype=np.float32)
-    radius = int(width/2)
-    # sigma = 1.0
-    sigma = radius/2.0  # for [-2*sigma, 2*sigma]
-    total = 0.0
-    # gaussian function
-    #gaussian = lambda x: x + 1
-    #kernel = gaussian(kernel)
-    for row in range(0, width):
-        for col in range(0, width):
-            kernel[row,col,0] = math.exp(-0.5 * (pow((col - radius) / sigma, 2.0) + pow((row - radius) / sigma, 2.0))) / (2 * math.pi * sigma * sigma)
-            total += kernel[row,col,0]
-    # normalize
-    kernel = kernel / total
+    kernel = GaussianKernels.get(width, None)
+    if kernel is None:
+        radius = int(width/2)
+        sigma = radius/2.0  # for [-2*sigma, 2*sigma]
+        offsets = (np.arange(width, dtype=np.float64) - radius) / sigma
+        kernel = np.exp(-0.5 * offsets * offsets)
+        kernel = (kernel / np.sum(kernel)).astype(np.float32)  # normalize
+        GaussianKernels[width] = kernel
     return kernel
-GaussianKernels = {w:gaussianKernel(w) for w in range(common.PixelRegionMin+2, common.PixelRegionMax+1, 2)}
 
 '''
 Function to check if a raw data photo is available, given a path to an existing photo.
@@ -330,32 +485,8 @@ Function to search for and retrieve the filepaths of ASD files, given capture ti
 :return: A list of filepaths of the ASD files.
 '''
 def findASDFiles(datadir, capture):
-    # find corresponding ASD dir
-    datestr = datetime.strftime(capture, "%Y-%m-%d")
-    pathASD = os.path.join(datadir, datestr, "ASD")
-    if not os.path.exists(pathASD):
-        return []
-
-    # find all capture time dirs
-    captureDirs = utility.findFiles(pathASD, mode=2)
-    captureDirs[:] = [dir for dir in captureDirs if utility.verifyDateTime(os.path.basename(dir), "%H.%M.%S")]
-    if len(captureDirs) <= 0:
-        return []
-
-    # find an ASD capture time within small threshold of HDR capture time
-    pathCapture = None
-    for dir in captureDirs:
-        timestr = datestr + " " + os.path.basename(dir)
-        time = datetime.strptime(timestr, "%Y-%m-%d %H.%M.%S")
-        delta = (capture - time).total_seconds()
-        if abs(delta) <= common.CaptureEpsilon:
-            pathCapture = os.path.join(pathASD, os.path.basename(dir))
-            break
-    if not os.path.exists(pathCapture):
-        return []
-
-    # gather all .txt versions of ASD files taken at capture timestamp
-    return utility.findFiles(pathCapture, mode=1, ext=["txt"])
+    # gather all .txt versions of ASD files taken at correlated capture timestamp
+    return utility_catalog.findASDFiles(datadir, capture, extension="txt")
 
 '''
 Function to search for and retrieve the filepath of the specified ASD file.
@@ -391,20 +522,13 @@ Function to load a ViewSpecPro spectroradiometer ASD file.
 :note: File format should be a TXT with the following data per line: Wavelength, Reading
 :note: The TXT files were converted from ViewSpecPro's software in the order .asd to .asd.rad to .asd.rad.txt .
        That may not be a requirement for ASD data of future projects.
+:note: Radiance is read from the packed store of the capture (see utility_spectra) when it exists and is up to date.
 :return: 2 lists, Xs (wavelengths) and Ys (radiance values)        
 '''
 def loadASDFile(filepath, step=1):
     if not os.path.exists(filepath):
         return [], []
-    wavelengths = []
-    radiances = []
-    with open(filepath) as f:
-        iter = itertools.islice(f, 1, None, step)
-        data = np.genfromtxt(iter)  #skip_header=1
-        wavelengths = data[:,0]
-        radiances = data[:,1]
-        #wavelengths, radiances = np.loadtxt(filepath, skiprows=1, unpack=True)
-    return wavelengths, radiances
+    return utility_spectra.loadSpectrum(filepath, step)
 
 # - sky cover -----------------------------------------------------------------
 # - sky cover -----------------------------------------------------------------
@@ -521,15 +645,39 @@ def computeSunPath(spadata):
 # - EXIF ----------------------------------------------------------------------
 # - EXIF ----------------------------------------------------------------------
 
+'''
+Function to retrieve the metadata of an image, reading its headers only once (cached by path and modification time).
+:param filepath: Path to image
+:return: A dict of Width, Height, Mode, DateTime (EXIF "DateTimeOriginal", or datetime.min) and Orientation (EXIF, 1 if unknown).
+'''
+def imageInfo(filepath):
+    key = (filepath, os.path.getmtime(filepath))
+    info = ImageInfoCache.get(key)
+    if info is not None:
+        return info
+
+    info = {"Width": 0, "Height": 0, "Mode": "", "DateTime": datetime.min, "Orientation": 1}
+    try:
+        with Image.open(filepath) as image:  # header only, pixels are not decoded
+            info["Width"], info["Height"], info["Mode"] = image.width, image.height, image.mode
+    except OSError:
+        pass
+    with open(filepath, 'rb') as f:
+        tags = exifread.process_file(f, details=False, stop_tag="EXIF DateTimeOriginal")
+    if "EXIF DateTimeOriginal" in tags and len(str(tags["EXIF DateTimeOriginal"])) > 0:
+        info["DateTime"] = datetime.strptime(str(tags["EXIF DateTimeOriginal"]), '%Y:%m:%d %H:%M:%S')
+    if "Image Orientation" in tags:
+        info["Orientation"] = tags["Image Orientation"].values[0]
+
+    ImageInfoCache.put(key, info)
+    return info
+
 '''
 Function to extract the "DateTimeOriginal" EXIF value of an image.
 :param filepath: Path to image
 '''
 def imageEXIFDateTime(filepath):
-    strDateTime = imageEXIFTag(filepath, "EXIF DateTimeOriginal")
-    if strDateTime is None or len(strDateTime) <= 0:
-        return datetime.min
-    return datetime.strptime(strDateTime, '%Y:%m:%d %H:%M:%S')
+    return imageInfo(filepath)["DateTime"]
 
 '''
 Function to extract the EXIF value of a particular tag.
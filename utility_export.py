@@ -0,0 +1,789 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# ====================================================================
+# @author: Joe Del Rocco
+# @since: 10/17/2026
+# @summary: A module that exports sky samples (pixels, coordinates and radiance) of captures to a dataset file.
+# @note: This module must not depend on Qt, so that exports can run headless.
+# ====================================================================
+import os
+import json
+import hashlib
+import math
+import multiprocessing
+from collections import OrderedDict
+from datetime import datetime
+import numpy as np
+import common
+import utility_angles
+import utility_color
+import utility_catalog
+import utility_data
+# optional export formats
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:
+    pyarrow = None
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+
+Delimiter = ","
+ManifestExt = ".manifest.json"  # sidecar of a dataset file with its row count (see saveManifest)
+CountChunkSize = 1048576        # bytes read at a time when counting rows without a manifest
+PartPrefix = "part-"            # Parquet datasets are a directory of part files (one per export session)
+RowGroupRows = 65536            # rows per Parquet row group
+ChunkBytes = 1048576            # target size of HDF5 dataset chunks
+WorkerOptions = None            # export options of a worker process
+
+
+'''
+Function to validate export options.
+:param options: A dict of export options.
+:return: True if all default export options are defined (extras are ok), False otherwise.
+'''
+def validateOptions(options):
+    for key in common.DefExportOptions:
+        if (key not in options):
+            return False
+    return True
+
+'''
+Function to remove samples in the circumsolar avoidance region.
+:param samples: A list of sampling pattern indices.
+:param sunpos: Sun position (azimuth, altitude).
+:param angle: Avoidance angle (degrees) around the sun, 0 to disable.
+:return: The list of sampling pattern indices outside of the avoidance region.
+'''
+def avoidSun(samples, sunpos, angle):
+    if angle <= 0:
+        return list(samples)
+    sunAvoidRads = math.radians(angle)
+    sunPosRads = (math.radians(sunpos[0]), math.radians(sunpos[1]))
+    return [idx for idx in samples if utility_angles.CentralAngle(sunPosRads, common.SamplingPatternRads[idx], inRadians=True) > sunAvoidRads]
+
+'''
+Function to write the header line of a dataset file.
+:param file: An opened (text) file.
+:param xoptions: Export options.
+'''
+def writeHeader(file, xoptions):
+    resolution = xoptions["SpectrumResolution"]
+    for fidx in xoptions["Features"]:
+        feature = common.SampleFeatures[fidx][0]
+        if feature == "Exposure":
+            if xoptions["IsHDR"]:
+                for j in range(0, len(common.Exposures)):
+                    file.write("Exposure" + str(j+1) + Delimiter)
+            else:
+                file.write("Exposure" + Delimiter)
+        elif feature == "PixelColor":
+            if xoptions["IsHDR"]:
+                for j in range(0, len(common.Exposures)):
+                    file.write("ColorA" + str(j+1) + Delimiter + "ColorB" + str(j+1) + Delimiter + "ColorC" + str(j+1) + Delimiter)
+            else:
+                file.write("ColorA" + Delimiter + "ColorB" + Delimiter + "ColorC" + Delimiter)
+        elif feature == "Radiance":
+            file.write(str(xoptions["SpectrumStart"]))  # first wavelength, no delimiter
+            for w in range(xoptions["SpectrumStart"] + resolution, xoptions["SpectrumEnd"] + 1, resolution):
+                file.write(Delimiter + str(w))  # delimiter plus next wavelength
+        else:
+            file.write(feature)
+            file.write(Delimiter)
+    file.write("\n")
+
+'''
+Function to compute the hash of the header line of a dataset file.
+:param header: The header line (bytes, including newline).
+:return: A hex string.
+'''
+def headerHash(header):
+    return hashlib.sha1(header).hexdigest()
+
+'''
+Function to read the first line of a dataset file.
+:return: The header line (bytes, including newline).
+'''
+def readHeader(fileout):
+    with open(fileout, 'rb') as file:
+        return file.readline()
+
+'''
+Function to load the manifest of a dataset file.
+:param fileout: Path to dataset file.
+:return: The manifest dict, or None if it is missing or does not describe the dataset file as it is now.
+'''
+def loadManifest(fileout):
+    try:
+        with open(fileout + ManifestExt, 'r') as file:
+            manifest = json.load(file)
+        if manifest["Size"] != os.path.getsize(fileout) or manifest["Header"] != headerHash(readHeader(fileout)):
+            return None
+        return manifest
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+'''
+Function to save the manifest of a dataset file (atomically, so it is never partially written).
+:param fileout: Path to dataset file.
+:param rows: Number of samples (rows after the header) in the dataset file.
+'''
+def saveManifest(fileout, rows):
+    manifest = {
+        "Rows": rows,
+        "Header": headerHash(readHeader(fileout)),
+        "Size": os.path.getsize(fileout)  # byte offset where the next append starts
+    }
+    writeManifest(fileout, manifest)
+
+'''
+Function to write the manifest of a dataset (atomically, so it is never partially written).
+:param fileout: Path to dataset file (or directory for Parquet).
+:param manifest: The manifest dict.
+'''
+def writeManifest(fileout, manifest):
+    try:
+        with open(fileout + ManifestExt + ".tmp", 'w') as file:
+            json.dump(manifest, file, indent=4)
+        os.replace(fileout + ManifestExt + ".tmp", fileout + ManifestExt)
+    except OSError:
+        pass  # manifest is only an optimization
+
+'''
+Function to count the samples already exported to a dataset file.
+Reads the manifest of the dataset file if it is up to date, otherwise counts newlines (and saves a new manifest).
+:param fileout: Path to dataset file.
+:return: Number of samples (rows after the header).
+'''
+def countSamples(fileout):
+    if not os.path.exists(fileout):
+        return 0
+    manifest = loadManifest(fileout)
+    if manifest is not None:
+        return manifest["Rows"]
+
+    # count lines in binary chunks (no decoding or row parsing)
+    lines = 0
+    last = b"\n"
+    with open(fileout, 'rb') as file:
+        for chunk in iter(lambda: file.read(CountChunkSize), b""):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last != b"\n":
+        lines += 1  # last line has no newline
+    rows = max(lines - 1, 0)  # skip header
+    saveManifest(fileout, rows)
+    return rows
+
+'''
+Function to format the radiance readings of a sample, clamped to non-negative.
+Readings are formatted in bulk, exactly as str(max(y, 0)) would format each one.
+:param ys: Numpy array of radiance readings.
+:return: Delimited string of readings (no trailing delimiter).
+'''
+def formatRadiance(ys):
+    texts = ys.astype(str)
+    texts[ys < 0] = '0'  # max(y, 0) returns int 0 for negative readings
+    return Delimiter.join(texts.tolist())
+
+'''
+Function to compute everything exported for samples of a capture.
+:param datadir: Path to data directory.
+:param xoptions: Export options.
+:param capture: Capture timestamp.
+:param samples: A list of sampling pattern indices to export.
+:param exposure: Exposure (seconds) of photo to sample when not exporting HDR.
+:param asdfiles: Optional list of ASD files of capture (searched for if not provided).
+:param photos: Optional dict of photo path -> pixels already decoded at full resolution (e.g. the photo shown in the viewer), so they are not decoded again.
+:return: A tuple (table, error message or empty string), where table is a dict of capture and per sample values.
+'''
+def computeCapture(datadir, xoptions, capture, samples, exposure, asdfiles=None, photos=None):
+    # find photos for every exposure we intend to export
+    exposures = []  # list of exposures to export
+    expphotos = []  # list of photos per exposure
+    if not xoptions["IsHDR"]:
+        photo = utility_data.findHDRFile(datadir, capture, exposure, common.SourceExt(xoptions["SourceExt"]).name.lower())
+        if not photo or len(photo) <= 0:
+            return None, "Error: Photo for " + str(exposure) + "s exposure not found. Export canceled."
+        exposures.append(exposure)
+        expphotos.append(photo)
+    else:
+        for exp in common.Exposures:
+            photo = utility_data.findHDRFile(datadir, capture, exp, common.SourceExt(xoptions["SourceExt"]).name.lower())
+            if not photo or len(photo) <= 0:
+                return None, "Error: Photo for exposure '" + str(exp) + "' not found. Export canceled."
+            exposures.append(exp)
+            expphotos.append(photo)
+
+    # find ASD files for every sample in sampling pattern (otherwise indexing will be off)
+    if asdfiles is None:
+        asdfiles = utility_catalog.findASDFiles(datadir, capture, extension="txt")
+    if len(asdfiles) <= 0:
+        return None, "Error: No ASD .txt files found for " + str(capture) + ". Export canceled."
+    if len(asdfiles) != len(common.SamplingPattern):
+        return None, "Error: Found " + str(len(asdfiles)) + " ASD files for " + str(capture) + ". Sample pattern should have " + str(len(common.SamplingPattern)) + ". Export canceled."
+
+    # compute sun position
+    spa = utility_data.deepcopySPAData(common.SPASiteData)
+    utility_data.fillSPADateTime(spa, capture)
+    sunpos = utility_data.computeSunPosition(spa)
+
+    coords = [common.SamplingPattern[i] for i in samples]  # sample coordinates
+
+    # determine pixel regions and weighting
+    pixweight = common.PixelWeighting(xoptions["PixelWeighting"])
+    pixregions = []
+    if xoptions["ComputePixelRegion"]:
+        pixregions = [common.AltitudeRegionMap[c[1]] for c in coords]
+    else:
+        reg = xoptions["PixelRegion"]
+        pixregions = [reg for i in range(0, len(coords))]
+
+    # compute pixels (each photo is decoded once, and its size is taken from its pixels)
+    exppixels = []  # list of lists of pixels per exposure
+    points = None
+    for i in range(0, len(exposures)):
+        if photos is not None and xoptions["PhotoScale"] <= 1 and expphotos[i] in photos:
+            pixels, scale = photos[expphotos[i]], 1
+        else:
+            pixels, scale = utility_data.loadImagePixels(expphotos[i], xoptions["PhotoScale"])
+        if pixels is None:
+            return None, "Error: Photo '" + expphotos[i] + "' could not be loaded. Export canceled."
+        if points is None:
+            # compute locations in photo to sample from
+            # NOTE: assumes same positions for all files! (speed up) could be recomputed per file
+            filesamplepoints = utility_data.computePointsInImage(expphotos[i], common.SamplingPattern, (pixels.shape[1], pixels.shape[0]))
+            points = [filesamplepoints[j] for j in samples]
+            # regions shrink with photos decoded at reduced resolution (but are exported as configured)
+            sampleregions = pixregions if scale <= 1 else [int(r / scale) | 1 for r in pixregions]
+        exppixels.append(utility_data.collectPixels(points, sampleregions, pixels=pixels, weighting=pixweight))
+
+    # modify pixels per color model (all pixels of an exposure at once)
+    color = common.ColorModel(xoptions["ColorModel"])
+    if color != common.ColorModel.RGB:
+        for j in range(0, len(exppixels)):
+            exppixels[j] = utility_color.convertColors(exppixels[j], color).tolist()
+
+    # modify coordinates per coordinate system
+    coordsys = common.CoordSystem(xoptions["CoordSystem"])
+    if coordsys == common.CoordSystem.Polar:
+        coordsfinal = coords
+        sunposfinal = sunpos
+    elif coordsys == common.CoordSystem.PolarNorm:
+        coordsfinal = [(c[0]/360.0, c[1]/90.0) for c in coords]
+        sunposfinal = (sunpos[0]/360.0, sunpos[1]/90.0)
+    elif coordsys == common.CoordSystem.UV:
+        us, vs = utility_angles.SkyCoords2FisheyeUVs([c[0] for c in coords], [c[1] for c in coords])
+        coordsfinal = list(zip(us.tolist(), vs.tolist()))
+        sunposfinal = (utility_angles.SkyCoord2FisheyeUV(sunpos[0], sunpos[1]))
+
+    # load radiance (every resolution^th reading of export spectral range)
+    speccount = xoptions["SpectrumEnd"] - xoptions["SpectrumStart"] + 1
+    resolution = xoptions["SpectrumResolution"]
+    radiances = []
+    if common.SampleFeatureIdxMap["Radiance"] in xoptions["Features"]:
+        for sIdx in samples:
+            xs, ys = utility_data.loadASDFile(asdfiles[sIdx])
+            ys = ys[0:speccount:resolution]
+            if len(ys) != len(range(0, speccount, resolution)):
+                return None, "Error: ASD file " + asdfiles[sIdx] + " has less than " + str(speccount) + " readings. Export canceled."
+            radiances.append(ys)
+
+    table = {
+        "Capture": capture,
+        "Samples": samples,
+        "CoordSystem": coordsys,
+        "SunPosition": sunposfinal,
+        "SunPointAngles": [math.degrees(utility_angles.CentralAngle(sunpos, c)) for c in coords],
+        "Coords": coordsfinal,
+        "SkyCover": utility_data.findCaptureSkyCover(capture, common.SkyCoverData),
+        "PixelRegions": pixregions,
+        "PixelWeighting": pixweight,
+        "ColorModel": color,
+        "Exposures": exposures,
+        "Pixels": exppixels,
+        "Radiances": radiances
+    }
+    return table, ""
+
+'''
+Function to format a capture table (see computeCapture) as dataset file rows.
+:param table: A capture table.
+:param xoptions: Export options.
+:return: Rows text.
+'''
+def formatRows(table, xoptions):
+    capture = table["Capture"]
+    coordsfinal = table["Coords"]
+
+    # format fields that are the same for every sample once
+    fields = {}
+    fields["SunAzimuth"] = '{0:.4f}'.format(table["SunPosition"][0]) + Delimiter
+    fields["SunAltitude"] = '{0:.4f}'.format(table["SunPosition"][1]) + Delimiter
+    fields["SkyCover"] = str(table["SkyCover"].value) + Delimiter
+    fields["PixelWeighting"] = str(table["PixelWeighting"].value) + Delimiter
+    fields["ColorModel"] = str(table["ColorModel"].value) + Delimiter
+    fields["Exposure"] = "".join([str(exp) + Delimiter for exp in table["Exposures"]])
+    prefix = str(capture.date()) + Delimiter + str(capture.time()) + Delimiter + str(table["CoordSystem"].value) + Delimiter
+    features = [common.SampleFeatures[aIdx][0] for aIdx in xoptions["Features"]]
+
+    # format each selected sample (date, time and space are required, everything else is optional)
+    rows = []
+    for i, sIdx in enumerate(table["Samples"]):
+        row = [prefix]
+        for feature in features:
+            if feature in fields:
+                row.append(fields[feature])
+            elif feature == "SamplePatternIndex":
+                row.append(str(sIdx) + Delimiter)
+            elif feature == "SampleAzimuth":
+                row.append('{0:.4f}'.format(coordsfinal[i][0]) + Delimiter)
+            elif feature == "SampleAltitude":
+                row.append('{0:.4f}'.format(coordsfinal[i][1]) + Delimiter)
+            elif feature == "SunPointAngle":
+                row.append('{0:.3f}'.format(table["SunPointAngles"][i]) + Delimiter)
+            elif feature == "PixelRegion":
+                row.append(str(table["PixelRegions"][i]) + Delimiter)
+            elif feature == "PixelColor":
+                for pixels in table["Pixels"]:
+                    row.append(str(pixels[i][0]) + Delimiter + str(pixels[i][1]) + Delimiter + str(pixels[i][2]) + Delimiter)
+            elif feature == "Radiance":
+                row.append(formatRadiance(table["Radiances"][i]))  # no delimiter after last wavelength
+        row.append("\n")
+        rows.append("".join(row))
+    return "".join(rows)
+
+'''
+Function to convert a capture table (see computeCapture) to typed columns, named like the columns of a dataset file.
+Radiance is a single (samples x wavelengths) float32 column.
+:param table: A capture table.
+:param xoptions: Export options.
+:return: An OrderedDict of column name -> numpy array (one value per sample).
+'''
+def tableColumns(table, xoptions):
+    count = len(table["Samples"])
+    capture = table["Capture"]
+    columns = OrderedDict()
+    columns["Date"] = np.full(count, np.datetime64(capture.date(), 'D'))
+    columns["Time"] = np.full(count, capture.hour * 3600 + capture.minute * 60 + capture.second, dtype=np.int32)  # seconds since midnight
+    columns["Space"] = np.full(count, table["CoordSystem"].value, dtype=np.int8)
+    for aIdx in xoptions["Features"]:
+        feature = common.SampleFeatures[aIdx][0]
+        if feature == "SunAzimuth":
+            columns[feature] = np.full(count, table["SunPosition"][0], dtype=np.float64)
+        elif feature == "SunAltitude":
+            columns[feature] = np.full(count, table["SunPosition"][1], dtype=np.float64)
+        elif feature == "SkyCover":
+            columns[feature] = np.full(count, table["SkyCover"].value, dtype=np.int8)
+        elif feature == "SamplePatternIndex":
+            columns[feature] = np.array(table["Samples"], dtype=np.int16)
+        elif feature == "SampleAzimuth":
+            columns[feature] = np.array([c[0] for c in table["Coords"]], dtype=np.float64)
+        elif feature == "SampleAltitude":
+            columns[feature] = np.array([c[1] for c in table["Coords"]], dtype=np.float64)
+        elif feature == "SunPointAngle":
+            columns[feature] = np.array(table["SunPointAngles"], dtype=np.float64)
+        elif feature == "PixelRegion":
+            columns[feature] = np.array(table["PixelRegions"], dtype=np.int16)
+        elif feature == "PixelWeighting":
+            columns[feature] = np.full(count, table["PixelWeighting"].value, dtype=np.int8)
+        elif feature == "ColorModel":
+            columns[feature] = np.full(count, table["ColorModel"].value, dtype=np.int8)
+        elif feature == "Exposure":
+            for j, exp in enumerate(table["Exposures"]):
+                name = "Exposure" + (str(j+1) if xoptions["IsHDR"] else "")
+                columns[name] = np.full(count, exp, dtype=np.float64)
+        elif feature == "PixelColor":
+            dtype = np.uint8 if table["ColorModel"] == common.ColorModel.RGB else np.float64
+            for j, pixels in enumerate(table["Pixels"]):
+                pixels = np.array([p[0:3] for p in pixels], dtype=dtype).reshape(count, 3)
+                suffix = str(j+1) if xoptions["IsHDR"] else ""
+                columns["ColorA" + suffix] = pixels[:,0]
+                columns["ColorB" + suffix] = pixels[:,1]
+                columns["ColorC" + suffix] = pixels[:,2]
+        elif feature == "Radiance":
+            columns[feature] = np.maximum(np.array(table["Radiances"], dtype=np.float32), 0)
+    return columns
+
+'''
+Function to compute the export block of samples of a capture, in the form the dataset format writes.
+:param datadir: Path to data directory.
+:param xoptions: Export options.
+:param capture: Capture timestamp.
+:param samples: A list of sampling pattern indices to export.
+:param exposure: Exposure (seconds) of photo to sample when not exporting HDR.
+:param asdfiles: Optional list of ASD files of capture (searched for if not provided).
+:param photos: Optional dict of photo path -> pixels already decoded (see computeCapture).
+:return: A tuple (rows text or columns, number of rows, error message or empty string).
+'''
+def formatCapture(datadir, xoptions, capture, samples, exposure, asdfiles=None, photos=None):
+    # no samples to export
+    if len(samples) <= 0:
+        return None, 0, ""
+
+    table, error = computeCapture(datadir, xoptions, capture, samples, exposure, asdfiles, photos)
+    if table is None:
+        return None, 0, error
+
+    if common.ExportFormat(xoptions["Format"]) == common.ExportFormat.CSV:
+        return formatRows(table, xoptions), len(samples), ""
+    return tableColumns(table, xoptions), len(samples), ""
+
+'''
+A dataset file of text rows (see writeHeader and formatRows), kept with a manifest (see saveManifest).
+'''
+class DatasetCSV(object):
+    def __init__(self, fileout, xoptions):
+        self.fileout = fileout
+        # create with header, if not exists
+        if not os.path.exists(fileout):
+            if len(os.path.dirname(fileout)) > 0 and not os.path.exists(os.path.dirname(fileout)):
+                os.makedirs(os.path.dirname(fileout))
+            with open(fileout, "w") as file:
+                writeHeader(file, xoptions)
+            saveManifest(fileout, 0)
+        self.rows = countSamples(fileout)
+        self.file = open(fileout, "a")
+
+    def count(self):
+        return self.rows
+
+    def write(self, block, count):
+        if block is None or count <= 0:
+            return
+        self.file.write(block)
+        self.rows += count
+
+    def close(self):
+        self.file.close()
+        saveManifest(self.fileout, self.rows)
+
+'''
+A dataset directory of Parquet part files. Every export session writes a new part file, in row groups of about RowGroupRows rows.
+Radiance is a fixed size list of float32 column, and wavelengths and export options are stored in the schema metadata.
+Rows and size of each part file are kept in a manifest sidecar of the directory, so only footers of parts it doesn't know are read.
+'''
+class DatasetParquet(object):
+    def __init__(self, fileout, xoptions):
+        self.fileout = fileout
+        self.xoptions = xoptions
+        self.writer = None
+        self.path = ""
+        self.pending = []
+        self.pendingRows = 0
+        self.written = 0
+        self.rows = 0
+        os.makedirs(fileout, exist_ok=True)
+        try:
+            with open(fileout + ManifestExt, 'r') as file:
+                known = json.load(file)["Parts"]
+        except (OSError, ValueError, KeyError, TypeError):
+            known = {}
+        self.parts = {}  # part file -> [rows, size]
+        for part in sorted([f for f in os.listdir(fileout) if f.startswith(PartPrefix) and f.endswith(".parquet")]):
+            size = os.path.getsize(os.path.join(fileout, part))
+            if isinstance(known.get(part, None), list) and known[part][1] == size:
+                self.parts[part] = known[part]
+            else:
+                self.parts[part] = [pq.ParquetFile(os.path.join(fileout, part)).metadata.num_rows, size]  # footer only
+            self.rows += self.parts[part][0]
+        if self.parts != known:
+            self.save()
+
+    def count(self):
+        return self.rows
+
+    def write(self, block, count):
+        if count <= 0:
+            return
+        arrays = []
+        for name, column in block.items():
+            if name == "Time":
+                arrays.append(pyarrow.array(column).cast(pyarrow.time32('s')))
+            elif column.ndim > 1:
+                arrays.append(pyarrow.FixedSizeListArray.from_arrays(pyarrow.array(column.ravel()), column.shape[1]))
+            else:
+                arrays.append(pyarrow.array(column))
+        self.pending.append(pyarrow.Table.from_arrays(arrays, names=list(block.keys())))
+        self.pendingRows += count
+        self.rows += count
+        if self.pendingRows >= RowGroupRows:
+            self.flush()
+
+    def flush(self):
+        if len(self.pending) <= 0:
+            return
+        table = pyarrow.concat_tables(self.pending)
+        if self.writer is None:
+            resolution = self.xoptions["SpectrumResolution"]
+            wavelengths = list(range(self.xoptions["SpectrumStart"], self.xoptions["SpectrumEnd"] + 1, resolution))
+            metadata = {b"Wavelengths": json.dumps(wavelengths).encode(), b"ExportOptions": json.dumps(self.xoptions).encode()}
+            schema = table.schema.with_metadata(metadata)
+            index = len(self.parts)
+            while os.path.exists(os.path.join(self.fileout, PartPrefix + "{0:05d}.parquet".format(index))):
+                index += 1  # another session wrote parts since this one opened
+            self.path = os.path.join(self.fileout, PartPrefix + "{0:05d}.parquet".format(index))
+            self.writer = pq.ParquetWriter(self.path, schema, compression='zstd')
+        self.writer.write_table(table.replace_schema_metadata(self.writer.schema.metadata), row_group_size=RowGroupRows)
+        self.written += self.pendingRows
+        self.pending = []
+        self.pendingRows = 0
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            self.parts[os.path.basename(self.path)] = [self.written, os.path.getsize(self.path)]
+            self.save()
+
+    def save(self):
+        writeManifest(self.fileout, {"Rows": self.rows, "Parts": self.parts})
+
+'''
+A dataset HDF5 file of matrices with one row per sample, for training: "meta" (samples x K float64) of every selected
+feature that is not a color or radiance, "pixels" (samples x C float32) of colors and "radiance" (samples x wavelengths float32).
+The column names of each matrix are in its "Columns" attribute (Date is days since 1970-01-01, Time is seconds since midnight),
+and wavelengths and export options are file attributes. Matrices are chunked, compressed and resizable, so appends extend them in place.
+'''
+class DatasetHDF5(object):
+    ShapeOptions = ("Features", "IsHDR", "SpectrumStart", "SpectrumEnd", "SpectrumResolution")  # options that change matrix columns
+
+    def __init__(self, fileout, xoptions):
+        if len(os.path.dirname(fileout)) > 0 and not os.path.exists(os.path.dirname(fileout)):
+            os.makedirs(os.path.dirname(fileout))
+        self.file = h5py.File(fileout, "a")
+        self.rows = self.file["meta"].shape[0] if "meta" in self.file else 0
+        if "ExportOptions" not in self.file.attrs:
+            resolution = xoptions["SpectrumResolution"]
+            self.file.attrs["Wavelengths"] = np.arange(xoptions["SpectrumStart"], xoptions["SpectrumEnd"] + 1, resolution)
+            self.file.attrs["ExportOptions"] = json.dumps(xoptions)
+
+    def validate(self, xoptions):
+        existing = json.loads(self.file.attrs["ExportOptions"])
+        for key in DatasetHDF5.ShapeOptions:
+            if existing.get(key, None) != xoptions[key]:
+                return "Error: HDF5 dataset was exported with different features or spectrum. Export canceled."
+        return ""
+
+    def count(self):
+        return self.rows
+
+    def write(self, block, count):
+        if count <= 0:
+            return
+        colors = [name for name in block if name.rstrip("0123456789") in ("ColorA", "ColorB", "ColorC")]
+        meta = [name for name in block if name != "Radiance" and name not in colors]
+        values = [block[name].astype(np.int64) if name == "Date" else block[name] for name in meta]
+        self.append("meta", np.stack(values, axis=1), meta, np.float64)
+        if len(colors) > 0:
+            self.append("pixels", np.stack([block[name] for name in colors], axis=1), colors, np.float32)
+        if "Radiance" in block:
+            self.append("radiance", block["Radiance"], [], np.float32)
+        self.rows += count
+
+    def append(self, name, data, columns, dtype):
+        if name not in self.file:
+            width = data.shape[1]
+            chunkrows = max(1, min(RowGroupRows, ChunkBytes // (width * np.dtype(dtype).itemsize)))
+            matrix = self.file.create_dataset(name, shape=(0, width), maxshape=(None, width), dtype=dtype, chunks=(chunkrows, width), compression="gzip", shuffle=True)
+            matrix.attrs["Columns"] = json.dumps(columns)
+        matrix = self.file[name]
+        start = matrix.shape[0]
+        matrix.resize(start + data.shape[0], axis=0)
+        matrix[start:] = data
+
+    def close(self):
+        self.file.close()
+
+'''
+Function to check that the module a dataset format is written with is available.
+:param format: An ExportFormat.
+:return: An error message, or empty string.
+'''
+def formatError(format):
+    if format == common.ExportFormat.Parquet and pyarrow is None:
+        return "Error: Parquet export requires the pyarrow module."
+    if format == common.ExportFormat.HDF5 and h5py is None:
+        return "Error: HDF5 export requires the h5py module."
+    return ""
+
+'''
+Function to open a dataset for appending, in the format of the export options.
+:param fileout: Path to dataset file (or directory for Parquet).
+:param xoptions: Export options.
+:return: A tuple (dataset, error message or empty string).
+'''
+def openDataset(fileout, xoptions):
+    format = common.ExportFormat(xoptions["Format"])
+    error = formatError(format)
+    if len(error) > 0:
+        return None, error + " Export canceled."
+    if format == common.ExportFormat.Parquet:
+        return DatasetParquet(fileout, xoptions), ""
+    if format == common.ExportFormat.HDF5:
+        dataset = DatasetHDF5(fileout, xoptions)
+        error = dataset.validate(xoptions)
+        if len(error) > 0:
+            dataset.close()
+            return None, error
+        return dataset, ""
+    return DatasetCSV(fileout, xoptions), ""
+
+'''
+Function to delete a dataset (file or Parquet part files, and manifest).
+:param fileout: Path to dataset file (or directory for Parquet).
+'''
+def removeDataset(fileout):
+    if os.path.exists(fileout + ManifestExt):
+        os.unlink(fileout + ManifestExt)
+    if os.path.isdir(fileout):
+        for f in os.listdir(fileout):
+            if f.startswith(PartPrefix) and f.endswith(".parquet"):
+                os.unlink(os.path.join(fileout, f))
+        if len(os.listdir(fileout)) <= 0:
+            os.rmdir(fileout)
+    elif os.path.exists(fileout):
+        os.unlink(fileout)
+
+'''
+Function to export samples of a capture, appended to a dataset (created if it does not exist).
+:param datadir: Path to data directory.
+:param fileout: Path to dataset file.
+:param xoptions: Export options.
+:param capture: Capture timestamp.
+:param samples: A list of sampling pattern indices to export.
+:param exposure: Exposure (seconds) of photo to sample when not exporting HDR.
+:param asdfiles: Optional list of ASD files of capture (searched for if not provided).
+:param photos: Optional dict of photo path -> pixels already decoded (see computeCapture).
+:param dataset: Optional dataset already open for appending (see openDataset), which is left open. Otherwise the dataset is opened and closed.
+:return: A tuple (number of samples exported, error message or empty string).
+'''
+def exportCapture(datadir, fileout, xoptions, capture, samples, exposure, asdfiles=None, photos=None, dataset=None):
+    # we shouldn't be here if export file hasn't been configured
+    if len(fileout) <= 0:
+        return 0, "Error: Please configure export file first."
+
+    block, count, error = formatCapture(datadir, xoptions, capture, samples, exposure, asdfiles, photos)
+    if len(error) > 0 or count <= 0:
+        return 0, error
+
+    if dataset is not None:
+        dataset.write(block, count)
+        return count, ""
+
+    dataset, error = openDataset(fileout, xoptions)
+    if dataset is None:
+        return 0, error
+    try:
+        dataset.write(block, count)
+    finally:
+        dataset.close()
+    return count, ""
+
+'''
+Function to initialize an export worker process.
+Workers may not share memory with the main process, so they load settings, data config and catalog on their own.
+:param appsettings: App settings of main process.
+:param xoptions: Export options.
+'''
+def initWorker(appsettings, xoptions):
+    global WorkerOptions
+    common.AppSettings.update(appsettings)
+    utility_data.PixelCache.resize(0)  # a worker never samples the same photo twice
+    utility_data.loadDataConfig()
+    utility_catalog.loadCatalog(common.AppSettings["DataDirectory"], reload=True)  # never use a connection of another process
+    WorkerOptions = xoptions
+
+'''
+Function to format the rows of a single export job, in a worker process.
+:param job: A tuple (capture, samples, exposure).
+:return: A tuple (rows text, number of rows, error message or empty string).
+'''
+def formatJob(job):
+    capture, samples, exposure = job
+    return formatCaptureSafe(common.AppSettings["DataDirectory"], WorkerOptions, capture, samples, exposure)
+
+'''
+Function to format the rows of a capture, reporting any failure (e.g. a corrupt photo or ASD file) as an error of that capture only.
+:return: A tuple (rows text, number of rows, error message or empty string), see formatCapture.
+'''
+def formatCaptureSafe(datadir, xoptions, capture, samples, exposure):
+    try:
+        return formatCapture(datadir, xoptions, capture, samples, exposure)
+    except Exception as e:
+        return None, 0, "Error: Failed to export " + str(capture) + ": " + str(e)
+
+'''
+Function to export samples of many captures in parallel, appended to a dataset file (created with a header if it does not exist).
+Captures are formatted by a pool of worker processes and written by this process only, in the order of jobs.
+:param datadir: Path to data directory.
+:param fileout: Path to dataset file.
+:param xoptions: Export options.
+:param jobs: A list of (capture, samples, exposure) tuples.
+:param processes: Number of worker processes, 0 for one per core, 1 to export in this process.
+:param progress: Optional callback(index, total, capture, count, error), called once per job in order.
+:return: A tuple (number of samples exported, number of captures failed).
+'''
+def exportCaptures(datadir, fileout, xoptions, jobs, processes=0, progress=None):
+    if len(fileout) <= 0 or len(jobs) <= 0:
+        return 0, 0
+    if processes <= 0:
+        processes = multiprocessing.cpu_count()
+    processes = min(processes, len(jobs))
+
+    dataset, error = openDataset(fileout, xoptions)
+    if dataset is None:
+        if progress is not None:
+            progress(0, len(jobs), jobs[0][0], 0, error)
+        return 0, len(jobs)
+
+    total = 0
+    failed = 0
+    if processes <= 1:
+        results = (formatCaptureSafe(datadir, xoptions, capture, samples, exposure) for capture, samples, exposure in jobs)
+        pool = None
+    else:
+        settings = dict(common.AppSettings)
+        settings["DataDirectory"] = datadir
+        pool = multiprocessing.Pool(processes, initializer=initWorker, initargs=(settings, xoptions))
+        results = pool.imap(formatJob, jobs)  # ordered, so output is the same regardless of processes
+    try:
+        for i, (block, count, error) in enumerate(results):
+            if len(error) > 0:
+                failed += 1
+            elif block is not None and count > 0:
+                dataset.write(block, count)
+                total += count
+            if progress is not None:
+                progress(i, len(jobs), jobs[i][0], count, error)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        dataset.close()
+    return total, failed
+
+'''
+Function to find all captures (with a correlated ASD capture) in a range of dates.
+:param datadir: Path to data directory.
+:param start: Optional first capture date string (e.g. "2012-11-06"), inclusive.
+:param end: Optional last capture date string, inclusive.
+:return: A sorted list of capture timestamps.
+'''
+def findCaptures(datadir, start=None, end=None):
+    captures = []
+    for datestr in utility_catalog.findCaptureDates(datadir):
+        if (start and datestr < start) or (end and datestr > end):
+            continue
+        for timestr in utility_catalog.findCaptureTimes(datadir, datestr):
+            try:
+                capture = datetime.strptime(datestr + " " + timestr, "%Y-%m-%d %H.%M.%S")
+            except ValueError:
+                continue
+            if len(utility_catalog.findASDCapture(datadir, capture)) > 0:
+                captures.append(capture)
+    return sorted(captures)
@@ -0,0 +1,69 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# ====================================================================
+# @author: Joe Del Rocco
+# @since: 10/17/2026
+# @summary: A module that loads photos for display, with numpy views of their pixels (no copies).
+# ====================================================================
+import sys
+import os
+from PyQt5.QtGui import QImage
+import numpy as np
+import common
+import utility
+
+
+PhotoCache = utility.LRUCache(common.DefAppSettings["PhotoCacheMB"] * 1048576, lambda p: p.nbytes())  # decoded photos: (path, mtime) -> PhotoBuffer
+
+
+'''
+Class holding a photo decoded for display (QImage), and a numpy view of its pixels that shares the memory of the QImage.
+The view is read-only and only valid while the photo is, so keep the photo (not just the view) for as long as the pixels are used.
+:note: Photos are cached and shared, so never paint into them.
+'''
+class PhotoBuffer(object):
+    def __init__(self, image):
+        # 32 bit formats are decoded into as is, anything else (e.g. grayscale) is converted once
+        if image.format() not in (QImage.Format_RGB32, QImage.Format_ARGB32):
+            image = image.convertToFormat(QImage.Format_RGB32)
+        self.image = image
+        ptr = image.constBits()  # const, so the QImage is not detached (copied)
+        ptr.setsize(image.byteCount())
+        rows = np.frombuffer(ptr, dtype=np.uint8).reshape(image.height(), image.bytesPerLine())
+        pixels = rows[:, 0:image.width() * 4].reshape(image.height(), image.width(), 4)
+        # 32 bit pixels are 0xAARRGGBB words, so bytes are BGRA (little-endian) or ARGB (big-endian)
+        # reorder channels to RGB with strides instead of copying
+        if sys.byteorder == 'little':
+            self.pixels = pixels[:, :, 2::-1]
+        else:
+            self.pixels = pixels[:, :, 1:4]
+
+    def width(self):
+        return self.image.width()
+
+    def height(self):
+        return self.image.height()
+
+    def nbytes(self):
+        return self.image.byteCount()
+
+'''
+Function to load a photo for display.
+Decoded photos are cached (see PhotoCacheMB), so going back and forth between captures doesn't decode them again.
+:param path: Path to photo.
+:return: A PhotoBuffer, or None if the photo does not exist or could not be decoded.
+'''
+def loadPhoto(path):
+    if path is None or not os.path.exists(path):
+        return None
+    key = (path, os.path.getmtime(path))
+    photo = PhotoCache.get(key)
+    if photo is not None:
+        return photo
+
+    image = QImage(path)
+    if image.isNull():
+        return None
+    photo = PhotoBuffer(image)
+    PhotoCache.put(key, photo)
+    return photo
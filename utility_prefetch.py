@@ -0,0 +1,147 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# ====================================================================
+# @author: Joe Del Rocco
+# @since: 10/17/2026
+# @summary: A module that prepares captures (photo, EXIF, sun position, ASD files) in background threads while scrubbing.
+# ====================================================================
+import threading
+import queue
+import common
+import utility_data
+import utility_catalog
+import utility_photo
+
+
+'''
+Function to prepare everything the viewer shows of a capture.
+This runs in prefetch threads, and in the viewer itself when a capture wasn't prefetched (yet).
+:param datadir: The data directory of the capture.
+:param capture: The (datetime) capture timestamp.
+:param exposure: Index of the exposure photo to load.
+:return: A dict of the capture's photos, decoded photo (PhotoBuffer), EXIF, sun position and ASD files.
+'''
+def prepareCapture(datadir, capture, exposure):
+    prepared = {
+        "Capture": capture,
+        "Exposure": exposure,
+        "Photos": utility_catalog.findCapturePhotos(datadir, capture, "jpg"),
+        "Photo": None,     # PhotoBuffer of the exposure photo (None if missing or could not be decoded)
+        "EXIF": {},
+        "SunPosition": None,
+        "ASDCapture": utility_catalog.findASDCapture(datadir, capture),
+        "ASDFiles": utility_catalog.findASDFiles(datadir, capture, extension="txt"),
+    }
+
+    # decode exposure photo
+    if 0 <= exposure < len(prepared["Photos"]):
+        path = prepared["Photos"][exposure]
+        prepared["Photo"] = utility_photo.loadPhoto(path)
+        prepared["EXIF"] = utility_data.imageEXIF(path)
+
+    # compute sun position (on a copy of site data, the viewer owns the global one)
+    spa = utility_data.deepcopySPAData(common.SPASiteData)
+    utility_data.fillSPADateTime(spa, capture)
+    prepared["SunPosition"] = utility_data.computeSunPosition(spa)
+
+    return prepared
+
+'''
+Class that prepares captures in a pool of background threads.
+Captures are scheduled as a window around the selected capture. Scheduling a new window cancels queued work
+of captures that are no longer in it, and drops their prepared results, so jumping around never piles up work.
+:param threads: Number of background threads.
+:param depth: Max number of captures queued at once.
+'''
+class Prefetcher(object):
+    def __init__(self, threads=2, depth=8):
+        self.queue = queue.Queue(maxsize=max(depth, 1))  # (datadir, key) of captures waiting to be prepared
+        self.lock = threading.Lock()
+        self.wanted = set()   # keys (capture, exposure) of current window
+        self.pending = set()  # keys queued or being prepared
+        self.results = {}     # key -> prepared capture
+        self.threads = [threading.Thread(target=self.work, daemon=True) for i in range(0, max(threads, 1))]
+        for thread in self.threads:
+            thread.start()
+
+    '''
+    Function to schedule a window of captures to prepare.
+    :param datadir: The data directory of the captures.
+    :param captures: List of (datetime) capture timestamps, in order of priority.
+    :param exposure: Index of the exposure photo to load.
+    '''
+    def schedule(self, datadir, captures, exposure):
+        with self.lock:
+            self.wanted = set((capture, exposure) for capture in captures)
+            self.cancel()
+            for key in [k for k in self.results.keys() if k not in self.wanted]:
+                del self.results[key]
+            for capture in captures:
+                key = (capture, exposure)
+                if key in self.results or key in self.pending:
+                    continue
+                try:
+                    self.queue.put_nowait((datadir, key))
+                except queue.Full:
+                    break
+                self.pending.add(key)
+
+    '''
+    Function to retrieve a prepared capture.
+    :param capture: The (datetime) capture timestamp.
+    :param exposure: Index of the exposure photo.
+    :return: The prepared capture (see prepareCapture), or None if it isn't prepared (yet).
+    '''
+    def get(self, capture, exposure):
+        with self.lock:
+            return self.results.get((capture, exposure), None)
+
+    '''
+    Function to keep a capture prepared elsewhere (e.g. by the viewer on a miss), until it is out of the scheduled window.
+    :param prepared: The prepared capture (see prepareCapture).
+    '''
+    def put(self, prepared):
+        with self.lock:
+            self.results[(prepared["Capture"], prepared["Exposure"])] = prepared
+
+    '''
+    Function to cancel all work and drop all prepared captures (e.g. when data directory changes).
+    '''
+    def clear(self):
+        with self.lock:
+            self.wanted = set()
+            self.cancel()
+            self.results.clear()
+
+    # drop queued work no longer wanted (captures already being prepared are finished, then dropped)
+    def cancel(self):
+        keep = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[1] in self.wanted:
+                keep.append(item)
+            else:
+                self.pending.discard(item[1])
+        for item in keep:
+            self.queue.put_nowait(item)
+
+    def work(self):
+        while True:
+            datadir, key = self.queue.get()
+            with self.lock:
+                if key not in self.wanted:
+                    self.pending.discard(key)
+                    continue
+            prepared = None
+            try:
+                prepared = prepareCapture(datadir, key[0], key[1])
+            except Exception:
+                pass  # missing or unreadable files, viewer reports them when capture is selected
+            finally:
+                with self.lock:
+                    self.pending.discard(key)
+                    if prepared is not None and key in self.wanted:
+                        self.results[key] = prepared
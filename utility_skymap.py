@@ -0,0 +1,195 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# ====================================================================
+# @author: Joe Del Rocco
+# @since: 10/17/2026
+# @summary: A module with precomputed per-resolution lookup maps between photo pixels and sky coordinates.
+# ====================================================================
+import os
+import hashlib
+import threading
+import numpy as np
+import common
+import utility_angles
+
+
+SkyMapDirname = "skymaps"   # folder of map files (in root of data directory)
+SkyMapVersion = 1           # bump when map layout or math changes, so stale files are never reused
+SkyMapInvRes = 10           # inverse map samples per degree (azimuth and altitude)
+SkyMapRowChunk = 256        # rows of pixels computed at a time while building
+SkyMaps = {}                # loaded maps: (width, height, lens key) -> SkyMap
+SkyMapsRequested = set()    # keys of maps loaded (or built) in the background, see requestSkyMap
+SkyMapsLock = threading.Lock()
+
+
+'''
+Class holding the lookup maps of one photo resolution and lens configuration.
+Forward maps are (height x height) float32 arrays of azimuth and altitude per pixel of the fisheye square (NaN outside the circle).
+Inverse maps are float32 arrays of photo x and y per (altitude, azimuth) on a grid of SkyMapInvRes samples per degree.
+'''
+class SkyMap(object):
+    def __init__(self, width, height, forward, inverse):
+        self.width = width
+        self.height = height
+        self.left = int(width/2) - int(height/2)  # x offset of fisheye square in photo (see Pixel2FisheyeUV)
+        self.forward = forward
+        self.inverse = inverse
+
+    '''
+    Function to lookup the sky coordinates of photo pixels.
+    :param xs: Array-like (or scalar) of photo x coordinates.
+    :param ys: Array-like (or scalar) of photo y coordinates.
+    :return: 2 numpy arrays (or scalars), azimuths and altitudes, NaN for pixels outside the fisheye circle.
+    '''
+    def skyCoords(self, xs, ys):
+        cols = np.asarray(xs, dtype=np.int64) - self.left
+        rows = np.asarray(ys, dtype=np.int64)
+        valid = (cols >= 0) & (cols < self.height) & (rows >= 0) & (rows < self.height)
+        cols = np.where(valid, cols, 0)
+        rows = np.where(valid, rows, 0)
+        azimuths = np.where(valid, self.forward[0, rows, cols], np.nan)
+        altitudes = np.where(valid, self.forward[1, rows, cols], np.nan)
+        return azimuths, altitudes
+
+    '''
+    Function to lookup the photo pixel coordinates of sky coordinates (bilinear over the inverse map).
+    :param azimuths: Array-like (or scalar) of azimuths (degrees).
+    :param altitudes: Array-like (or scalar) of altitudes (degrees), clamped to [0, 90].
+    :return: 2 numpy float arrays (or scalars), photo xs and ys.
+    '''
+    def pixels(self, azimuths, altitudes):
+        fa = (np.asarray(azimuths, dtype=np.float64) % 360) * SkyMapInvRes
+        fp = np.clip(np.asarray(altitudes, dtype=np.float64), 0, 90) * SkyMapInvRes
+        cols = self.inverse.shape[2]
+        rows = self.inverse.shape[1]
+        c0 = np.floor(fa).astype(np.int64) % cols
+        r0 = np.minimum(np.floor(fp).astype(np.int64), rows - 1)
+        c1 = (c0 + 1) % cols  # azimuth wraps around
+        r1 = np.minimum(r0 + 1, rows - 1)
+        wa = fa - np.floor(fa)
+        wp = fp - np.floor(fp)
+        coords = []
+        for m in self.inverse:
+            top = m[r0, c0] * (1 - wa) + m[r0, c1] * wa
+            bottom = m[r1, c0] * (1 - wa) + m[r1, c1] * wa
+            coords.append(top * (1 - wp) + bottom * wp)
+        return coords[0], coords[1]
+
+
+'''
+Function to compute a key that identifies the current lens configuration.
+:return: A short hex string.
+'''
+def lensKey():
+    desc = repr((SkyMapVersion, SkyMapInvRes, tuple(common.LensWarp), tuple(common.LensWarpInv)))
+    return hashlib.sha1(desc.encode('utf-8')).hexdigest()[:12]
+
+'''
+Function to compute the forward map of a photo resolution.
+:return: A (2 x height x height) float32 array of azimuths and altitudes.
+'''
+def buildForward(width, height, out=None):
+    if out is None:
+        out = np.empty((2, height, height), dtype=np.float32)
+    us = np.arange(height, dtype=np.float64) / height
+    for r in range(0, height, SkyMapRowChunk):
+        vs = np.arange(r, min(r + SkyMapRowChunk, height), dtype=np.float64) / height
+        u, v = np.meshgrid(us, vs)
+        azimuths, altitudes = utility_angles.FisheyeUVs2SkyCoords(u, v)
+        outside = ((u - 0.5) ** 2 + (v - 0.5) ** 2) > 0.25
+        azimuths[outside] = np.nan
+        altitudes[outside] = np.nan
+        out[0, r:r+len(vs)] = azimuths
+        out[1, r:r+len(vs)] = altitudes
+    return out
+
+'''
+Function to compute the inverse map of a photo resolution.
+:return: A (2 x altitudes x azimuths) float32 array of photo xs and ys.
+'''
+def buildInverse(width, height, out=None):
+    azimuths = np.arange(0, 360 * SkyMapInvRes, dtype=np.float64) / SkyMapInvRes
+    altitudes = np.arange(0, 90 * SkyMapInvRes + 1, dtype=np.float64) / SkyMapInvRes
+    a, p = np.meshgrid(azimuths, altitudes)
+    us, vs = utility_angles.SkyCoords2FisheyeUVs(a, p)
+    if out is None:
+        out = np.empty((2,) + a.shape, dtype=np.float32)
+    out[0] = (int(width/2) - int(height/2)) + (us * height)
+    out[1] = vs * height
+    return out
+
+'''
+Function to load (or build) a map file memory-mapped. A map is built into a temp file and renamed, so a partial file is never used.
+:return: The memory-mapped array, or None if the file could not be written.
+'''
+def openMapFile(path, shape, build, width, height):
+    if os.path.exists(path):
+        try:
+            data = np.load(path, mmap_mode='r')
+            if data.shape == shape and data.dtype == np.float32:
+                return data
+        except (OSError, ValueError):
+            pass
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = path + ".tmp"
+        data = np.lib.format.open_memmap(temp, mode='w+', dtype=np.float32, shape=shape)
+        build(width, height, data)
+        data.flush()
+        del data
+        os.replace(temp, path)
+        return np.load(path, mmap_mode='r')
+    except OSError:
+        return None
+
+'''
+Function to get the lookup maps of a photo resolution, for the current lens configuration.
+Maps are stored memory-mapped in the data directory, and are built in memory if that is not possible.
+:param width: Photo width in pixels.
+:param height: Photo height in pixels (and diameter of fisheye circle).
+:param datadir: Optional data directory to store maps in.
+:return: A SkyMap, or None if resolution is invalid.
+'''
+def loadSkyMap(width, height, datadir=None):
+    if width <= 0 or height <= 0:
+        return None
+    key = (width, height, lensKey())
+    skymap = SkyMaps.get(key, None)
+    if skymap is not None:
+        return skymap
+
+    forwardShape = (2, height, height)
+    inverseShape = (2, 90 * SkyMapInvRes + 1, 360 * SkyMapInvRes)
+    forward = inverse = None
+    if datadir and os.path.isdir(datadir):
+        prefix = os.path.join(datadir, SkyMapDirname, "{0}x{1}_{2}".format(width, height, key[2]))
+        forward = openMapFile(prefix + "_fwd.npy", forwardShape, buildForward, width, height)
+        inverse = openMapFile(prefix + "_inv.npy", inverseShape, buildInverse, width, height)
+    if forward is None:
+        forward = buildForward(width, height)
+    if inverse is None:
+        inverse = buildInverse(width, height)
+
+    skymap = SkyMap(width, height, forward, inverse)
+    SkyMaps[key] = skymap
+    return skymap
+
+'''
+Function to get the lookup maps of a photo resolution without waiting for them.
+The first request of a resolution loads (or builds, which is expensive for large photos) its maps in a background thread.
+:param width: Photo width in pixels.
+:param height: Photo height in pixels (and diameter of fisheye circle).
+:param datadir: Optional data directory to store maps in.
+:return: A SkyMap, or None if it isn't ready (yet).
+'''
+def requestSkyMap(width, height, datadir=None):
+    if width <= 0 or height <= 0:
+        return None
+    key = (width, height, lensKey())
+    with SkyMapsLock:
+        skymap = SkyMaps.get(key, None)
+        if skymap is not None or key in SkyMapsRequested:
+            return skymap
+        SkyMapsRequested.add(key)  # requested once, if loading fails callers keep computing coordinates directly
+    threading.Thread(target=loadSkyMap, args=(width, height, datadir), daemon=True).start()
+    return None
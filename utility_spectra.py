@@ -0,0 +1,191 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# ====================================================================
+# @author: Joe Del Rocco
+# @since: 10/17/2026
+# @summary: A module that loads ASD spectral radiance files, and packs them into binary stores for fast access.
+# ====================================================================
+import os
+import json
+import itertools
+import warnings
+import numpy as np
+import common
+import utility
+
+
+SpectraFilename = "spectra.npy"        # packed store of a capture (one per ASD capture folder)
+SpectraIndexFilename = "spectra.json"  # index of the text files packed into the store
+SpectraExt = ".txt"                    # ASD files that are packed
+Spectra = {}                           # opened stores: ASD capture folder -> (store mtime, data, index)
+SpectrumCache = utility.LRUCache(common.DefAppSettings["SpectrumCacheMB"] * 1048576, lambda s: s[0].nbytes + s[1].nbytes)
+
+
+# - text ----------------------------------------------------------------------
+# - text ----------------------------------------------------------------------
+# - text ----------------------------------------------------------------------
+
+'''
+Function to parse a ViewSpecPro spectroradiometer ASD text file.
+The whole file is read at once and parsed in bulk, then decimated by step.
+:param filepath: Path to TXT file with ASD data
+:param step: Indicates which rows of the file to load
+:note: File format should be a TXT with a header line and then the following data per line: Wavelength, Reading
+:return: 2 numpy arrays, Xs (wavelengths) and Ys (radiance values)
+'''
+def parseASDText(filepath, step=1):
+    with open(filepath, 'r') as f:
+        f.readline()  # header
+        text = f.read()
+    text = text.strip()
+    rows = text.count('\n') + 1 if text else 0
+    # np.fromstring stops (or raises, depending on numpy version) at the first token it can't parse,
+    # so fall back unless every line was parsed
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            values = np.fromstring(text, dtype=np.float64, sep=' ')
+    except ValueError:
+        values = None
+    if values is None or rows <= 0 or len(values) != rows * 2:
+        return parseASDTextSlow(filepath, step)
+    data = values.reshape(-1, 2)[::step]
+    return data[:,0].copy(), data[:,1].copy()
+
+'''
+Function to parse a ViewSpecPro spectroradiometer ASD text file (tolerant of malformed lines, but slow).
+:param filepath: Path to TXT file with ASD data
+:param step: Indicates which rows of the file to load
+:return: 2 numpy arrays, Xs (wavelengths) and Ys (radiance values)
+'''
+def parseASDTextSlow(filepath, step=1):
+    with open(filepath) as f:
+        iter = itertools.islice(f, 1, None, step)
+        data = np.genfromtxt(iter)  #skip_header=1
+    return data[:,0], data[:,1]
+
+# - packed store --------------------------------------------------------------
+# - packed store --------------------------------------------------------------
+# - packed store --------------------------------------------------------------
+
+'''
+Function to pack all ASD text files of a capture into a single float64 store (exactly the values parsed from text, so exports don't change).
+Row 0 of the store holds the wavelengths, and row i+1 holds the radiances of the i^th file (sorted by name).
+:param asddir: Path to an ASD capture folder (e.g. ".../2012-11-06/ASD/10.04.50").
+:return: Number of files packed, or 0 if there was nothing to pack or files have mismatched wavelengths.
+'''
+def packASDCapture(asddir):
+    files = sorted([f for f in os.listdir(asddir) if f.lower().endswith(SpectraExt) and os.path.isfile(os.path.join(asddir, f))])
+    if len(files) <= 0:
+        return 0
+
+    # parse every file of the capture
+    wavelengths = None
+    rows = []
+    index = []
+    for f in files:
+        path = os.path.join(asddir, f)
+        stat = os.stat(path)
+        xs, ys = parseASDText(path)
+        if wavelengths is None:
+            wavelengths = xs
+        elif len(xs) != len(wavelengths) or not np.array_equal(xs, wavelengths):
+            return 0
+        rows.append(ys)
+        index.append({"Name": f, "MTime": stat.st_mtime, "Size": stat.st_size})
+    data = np.vstack([wavelengths] + rows).astype(np.float64)
+
+    # release any opened store (and cached views of it) before overwriting it
+    Spectra.pop(asddir, None)
+    SpectrumCache.clear()
+
+    # write store and then index (a missing or older index means the store is stale)
+    pathData = os.path.join(asddir, SpectraFilename)
+    pathIndex = os.path.join(asddir, SpectraIndexFilename)
+    if os.path.exists(pathIndex):
+        os.unlink(pathIndex)
+    with open(pathData + ".tmp", "wb") as file:
+        np.save(file, data)
+    os.replace(pathData + ".tmp", pathData)
+    with open(pathIndex + ".tmp", "w") as file:
+        json.dump({"Store": os.path.getmtime(pathData), "Files": index}, file, indent=4)
+    os.replace(pathIndex + ".tmp", pathIndex)
+
+    return len(files)
+
+'''
+Function to open the packed store of an ASD capture folder (memory-mapped).
+:param asddir: Path to an ASD capture folder.
+:return: A tuple (data, index) where index maps filename -> (row, mtime, size), or None if there is no valid store.
+'''
+def openASDCapture(asddir):
+    pathData = os.path.join(asddir, SpectraFilename)
+    try:
+        mtime = os.path.getmtime(pathData)
+    except OSError:
+        Spectra.pop(asddir, None)
+        return None
+
+    # already opened
+    opened = Spectra.get(asddir, None)
+    if opened is not None and opened[0] == mtime:
+        return opened[1], opened[2]
+
+    # store and index must agree
+    try:
+        with open(os.path.join(asddir, SpectraIndexFilename), 'r') as file:
+            loaded = json.load(file)
+        if loaded["Store"] != mtime:
+            return None
+        data = np.load(pathData, mmap_mode='r')
+    except (OSError, ValueError, KeyError):
+        return None
+    index = {f["Name"]: (i + 1, f["MTime"], f["Size"]) for i, f in enumerate(loaded["Files"])}
+    if data.ndim != 2 or data.shape[0] != len(index) + 1 or data.dtype != np.float64:
+        return None
+
+    Spectra[asddir] = (mtime, data, index)
+    return data, index
+
+'''
+Function to load the spectral radiance of an ASD file from the packed store of its capture.
+:param filepath: Path to TXT file with ASD data
+:param step: Indicates which rows of the file to load
+:return: 2 numpy arrays (views into the store), Xs (wavelengths) and Ys (radiance values), or None if not packed or stale.
+'''
+def loadPackedSpectrum(filepath, step=1):
+    opened = openASDCapture(os.path.dirname(filepath))
+    if opened is None:
+        return None
+    data, index = opened
+    entry = index.get(os.path.basename(filepath), None)
+    if entry is None:
+        return None
+
+    # text file changed since it was packed
+    stat = os.stat(filepath)
+    if stat.st_mtime != entry[1] or stat.st_size != entry[2]:
+        return None
+
+    return data[0, ::step], data[entry[0], ::step]
+
+'''
+Function to load the spectral radiance of an ASD file, from the packed store if possible or its text otherwise.
+Loaded spectra are kept in an LRU cache (keyed by path, modification time and step), so reloading costs no disk reads.
+:param filepath: Path to TXT file with ASD data
+:param step: Indicates which rows of the file to load
+:return: 2 read-only numpy arrays, Xs (wavelengths) and Ys (radiance values)
+'''
+def loadSpectrum(filepath, step=1):
+    key = (filepath, os.path.getmtime(filepath), step)
+    spectrum = SpectrumCache.get(key)
+    if spectrum is not None:
+        return spectrum
+
+    spectrum = loadPackedSpectrum(filepath, step)
+    if spectrum is None:
+        spectrum = parseASDText(filepath, step)
+        spectrum[0].flags.writeable = False
+        spectrum[1].flags.writeable = False
+    SpectrumCache.put(key, spectrum)
+    return spectrum
@@ -17,6 +17,8 @@ import common
 import utility
 import utility_angles
 import utility_data
+import utility_photo
+import utility_skymap
 
 
 class ViewFisheye(QWidget):
@@ -28,19 +30,26 @@ class ViewFisheye(QWidget):
     SampleRadius = 10       # pixels, scales as photo scales
     SelectedPixelBox = 64   # pixels, width and height
 
+    # static HUD layers (in drawing order)
+    Layer = Enum('Layer', 'Grid LensWarp Compass Samples SunPath Selected Info')
+
     def __init__(self, parent):
         super().__init__()
 
         # members
         self.parent = parent
         self.myPhoto = QImage()
+        self.myPhotoBuffer = None        # photo and the numpy view of its pixels (myPhoto and myPhotoPixels, which share memory)
         self.myPhotoPixels = np.zeros(shape=(1, 1, 4))
+        self.myPhotoScaled = QPixmap()   # photo scaled to its size on screen (what is painted, pixels are sampled from full resolution)
+        self.myPhotoScaledKey = 0        # cache key of photo that was scaled
         self.myPhotoPath = ""
         self.myPhotoTime = datetime(1,1,1)
         self.myPhotoSrcRect = QRect()
         self.myPhotoDestRect = QRect()
         self.myPhotoRadius = 0
         self.myPhotoRotation = 0
+        self.mySkyMap = None             # pixel <-> sky coordinate lookup maps of photo resolution
         self.rawAvailable = False
         self.coordsMouse = (0, 0)
         self.viewCenter = (0, 0)
@@ -60,6 +69,9 @@ class ViewFisheye(QWidget):
         # members - preloaded graphics
         self.painter = QPainter()
         self.mask = QImage()
+        self.layers = {}                 # Layer -> QPixmap of a static HUD layer (rendered on first paint after it changes)
+        self.layersBounds = None         # bounds the layers were rendered for
+        self.overlay = None              # QPixmap of all visible layers composited (None when a layer changed)
         self.pathSun = QPainterPath()
         self.penText = QPen(Qt.white, 1, Qt.SolidLine)
         self.penLens = QPen(Qt.magenta, 1, Qt.SolidLine)
@@ -90,12 +102,16 @@ class ViewFisheye(QWidget):
             self.sampleAreaVisible.append([])
             color.setHsv(t, int(utility.normalize(p, 0, 90) * 127 + 128), 255)
             self.penSelected.append(QPen(color, 3, Qt.SolidLine))
+        self.invalidateLayers()
 
-    def setPhoto(self, path, exif=None):
-        # if photo is valid
-        if path is not None and os.path.exists(path):
+    def setPhoto(self, path, exif=None, photo=None):
+        # if photo is valid (decode it unless it was already, e.g. prefetched)
+        if photo is None:
+            photo = utility_photo.loadPhoto(path)
+        if photo is not None:
             self.myPhotoPath = path
-            self.myPhoto = QImage(path)
+            self.myPhotoBuffer = photo
+            self.myPhoto = photo.image
             self.myPhotoSrcRect = QRect(0, 0, self.myPhoto.width(), self.myPhoto.height())
             self.myPhotoDestRect = QRect(0, 0, self.width(), self.height())
             self.rawAvailable = utility_data.isHDRRawAvailable(path)
@@ -104,30 +120,22 @@ class ViewFisheye(QWidget):
             else:
                 self.myPhotoTime = utility_data.imageEXIFDateTime(path)
 
-            # cache each sample's coordinate in the photo
-            # note: technically doesn't need to be recalculated if all photos have same resolution!
-            self.samplePointsInFile = utility_data.computePointsInImage(path, common.SamplingPattern)
-
-            # keep a copy the image's pixels in memory (used later for exporting, etc.)
-            ptr = self.myPhoto.bits()
-            ptr.setsize(self.myPhoto.byteCount())
-            pixbgr = np.asarray(ptr).reshape(self.myPhoto.height(), self.myPhoto.width(), 4)
-            # HACKAROONIE: byte order is not the same as image format, so swapped it around :/
-            # TODO: should handle this better
-            self.myPhotoPixels = np.copy(pixbgr)
-            red = np.copy(self.myPhotoPixels[:, :, 0])
-            self.myPhotoPixels[:, :, 0] = self.myPhotoPixels[:, :, 2]
-            self.myPhotoPixels[:, :, 2] = red
-            # rgba = self.myPhoto.pixelColor(center[0], center[1])
-            # print((rgba.red(), rgba.green(), rgba.blue()))
-            # rgba = pixrgb[center[1], center[0]]
-            # print(rgba)
+            # cache each sample's coordinate in the photo (computed once per resolution)
+            self.samplePointsInFile = utility_data.computePointsInImage(path, common.SamplingPattern, (self.myPhoto.width(), self.myPhoto.height()))
+
+            # lookup maps for this resolution (only built once in the background, then memory-mapped from data directory)
+            self.mySkyMap = utility_skymap.requestSkyMap(self.myPhoto.width(), self.myPhoto.height(), common.AppSettings["DataDirectory"])
+
+            # view of the photo's pixels in RGB order (no copy)
+            self.myPhotoPixels = photo.pixels
 
         # photo is null or missing
         else:
             self.myPhoto = QImage()
+            self.myPhotoBuffer = None
             self.myPhotoPixels = np.zeros(shape=(1,1,4))
             self.myPhotoPath = ""
+            self.mySkyMap = None
             self.myPhotoTime = datetime(1, 1, 1)
             self.myPhotoSrcRect = QRect()
             self.myPhotoDestRect = QRect()
@@ -135,15 +143,19 @@ class ViewFisheye(QWidget):
 
         # precompute as much as we can before any drawing
         self.computeBounds()
+        self.invalidateLayers(ViewFisheye.Layer.Info)
 
     def setSunPath(self, sunpath):
         self.sunPathPoints = sunpath
+        self.invalidateLayers(ViewFisheye.Layer.SunPath)
 
     def setSunPosition(self, pos):
         self.sunPosition = pos
+        self.invalidateLayers(ViewFisheye.Layer.SunPath)
 
     def setSkycover(self, sc):
         self.skyCover = sc
+        self.invalidateLayers(ViewFisheye.Layer.Info)
 
     def getSamplePatternRGB(self, index):
         if index < 0 or index >= len(common.SamplingPattern):
@@ -153,6 +165,7 @@ class ViewFisheye(QWidget):
 
     def resetRotation(self, angles=0):
         self.myPhotoRotation = angles
+        self.invalidateLayers(ViewFisheye.Layer.Info)
 
     def selectSamples(self, message="none"):
         # nothing to do if no photo loaded
@@ -177,6 +190,7 @@ class ViewFisheye(QWidget):
             self.samplesSelected[:] = [idx for idx in self.samplesSelected if utility_angles.CentralAngle(sunPosRads, common.SamplingPatternRads[idx], inRadians=True) > sunAvoidRads]
 
         # update
+        self.invalidateLayers(ViewFisheye.Layer.Selected)
         self.repaint()
         self.parent.graphSamples(self.samplesSelected)
 
@@ -206,6 +220,7 @@ class ViewFisheye(QWidget):
                 self.myPhotoRotation %= 360
             else:
                 self.myPhotoRotation %= -360
+            self.invalidateLayers(ViewFisheye.Layer.Info)
 
         # lastly, cache mouse coordinates and update
         self.coordsMouse = (event.x(), event.y())
@@ -365,6 +380,7 @@ class ViewFisheye(QWidget):
 
         # sort selection for easier searching later
         self.samplesSelected.sort()
+        self.invalidateLayers(ViewFisheye.Layer.Selected)
 
     def computeBounds(self):
         if self.myPhoto.isNull():
@@ -372,9 +388,12 @@ class ViewFisheye(QWidget):
             self.viewCenter = (self.width() / 2, self.height() / 2)
             self.myPhotoRadius = 0
             self.myPhotoDiameter = 0
+            self.myPhotoScaled = QPixmap()
+            self.myPhotoScaledKey = 0
             for i in range(0, len(common.SamplingPattern)):
                 self.samplePoints[i] = (0, 0)
                 self.sampleAreaVisible[i] = []
+            self.invalidateLayers()
             return
 
         # scale photo destination rect to fit photo on screen
@@ -391,6 +410,7 @@ class ViewFisheye(QWidget):
         # center the photo dest rect
         self.myPhotoDestRect.moveTo(self.width() / 2 - self.myPhotoDestRect.width() / 2,
                                     self.height() / 2 - self.myPhotoDestRect.height() / 2)
+        self.scalePhoto()
 
         # NOTE - THESE ARE THE MOST IMPORTANT COMPUTATIONS FROM WHICH EVERYTHING ELSE IS PLOTTED
         self.viewCenter = (self.width() / 2, self.height() / 2)
@@ -405,22 +425,20 @@ class ViewFisheye(QWidget):
         # compute sampling pattern collision bounds
         ViewFisheye.SampleRadius = self.myPhotoRadius / 50
         hFOV = common.DataConfig["RadianceFOV"] / 2
-        for i in range(0, len(common.SamplingPattern)):
-            # compute sample bounds
-            u, v = utility_angles.SkyCoord2FisheyeUV(common.SamplingPattern[i][0], common.SamplingPattern[i][1])
-            x = self.myPhotoTopLeft[0] + (u * self.myPhotoDiameter)
-            y = self.myPhotoTopLeft[1] + (v * self.myPhotoDiameter)
-            self.samplePoints[i] = (x, y)
-            # compute sampling pattern actual sampling areas (projected differential angle area)
-            p1 = utility_angles.SkyCoord2FisheyeUV(common.SamplingPattern[i][0] - hFOV, common.SamplingPattern[i][1] - hFOV)
-            p2 = utility_angles.SkyCoord2FisheyeUV(common.SamplingPattern[i][0] - hFOV, common.SamplingPattern[i][1] + hFOV)
-            p3 = utility_angles.SkyCoord2FisheyeUV(common.SamplingPattern[i][0] + hFOV, common.SamplingPattern[i][1] + hFOV)
-            p4 = utility_angles.SkyCoord2FisheyeUV(common.SamplingPattern[i][0] + hFOV, common.SamplingPattern[i][1] - hFOV)
-            p1 = QPoint(self.myPhotoTopLeft[0] + (p1[0] * self.myPhotoDiameter), self.myPhotoTopLeft[1] + (p1[1] * self.myPhotoDiameter))
-            p2 = QPoint(self.myPhotoTopLeft[0] + (p2[0] * self.myPhotoDiameter), self.myPhotoTopLeft[1] + (p2[1] * self.myPhotoDiameter))
-            p3 = QPoint(self.myPhotoTopLeft[0] + (p3[0] * self.myPhotoDiameter), self.myPhotoTopLeft[1] + (p3[1] * self.myPhotoDiameter))
-            p4 = QPoint(self.myPhotoTopLeft[0] + (p4[0] * self.myPhotoDiameter), self.myPhotoTopLeft[1] + (p4[1] * self.myPhotoDiameter))
-            self.sampleAreaVisible[i] = [p1, p2, p3, p4]
+        if len(common.SamplingPattern) > 0:
+            # compute sample center and sampling area corners (projected differential angle area) in one batch
+            azis = np.array([c[0] for c in common.SamplingPattern])
+            alts = np.array([c[1] for c in common.SamplingPattern])
+            us, vs = utility_angles.SkyCoords2FisheyeUVs(
+                np.stack([azis, azis - hFOV, azis - hFOV, azis + hFOV, azis + hFOV]),
+                np.stack([alts, alts - hFOV, alts + hFOV, alts + hFOV, alts - hFOV]))
+            xs = self.myPhotoTopLeft[0] + (us * self.myPhotoDiameter)
+            ys = self.myPhotoTopLeft[1] + (vs * self.myPhotoDiameter)
+            for i in range(0, len(common.SamplingPattern)):
+                # compute sample bounds
+                self.samplePoints[i] = (float(xs[0, i]), float(ys[0, i]))
+                # compute sampling pattern actual sampling areas
+                self.sampleAreaVisible[i] = [QPoint(xs[j, i], ys[j, i]) for j in range(1, 5)]
 
         # compute compass lines
         self.compassTicks.clear()
@@ -449,38 +467,34 @@ class ViewFisheye(QWidget):
                 u = (point[0] - self.myPhotoTopLeft[0]) / self.myPhotoDiameter
                 v = (point[1] - self.myPhotoTopLeft[1]) / self.myPhotoDiameter
                 self.gridUVs.append((u, v))
-                t, p = utility_angles.FisheyeUV2SkyCoord(u, v)
-                self.gridskycoords.append((t, p))
+        if len(self.gridUVs) > 0:
+            ts, ps = utility_angles.FisheyeUVs2SkyCoords([uv[0] for uv in self.gridUVs], [uv[1] for uv in self.gridUVs])
+            self.gridskycoords = list(zip(ts.tolist(), ps.tolist()))
 
         # compute lens (ideal and actual) radii for drawn latitude ellipses along zenith
         self.lensIdealRadii.clear()
         self.lensRealRadii.clear()
-        for alt in common.SamplingPatternAlts:
-            # ideal lens
-            u, v = utility_angles.SkyCoord2FisheyeUV(90, alt, lenswarp=False)
-            x = self.myPhotoTopLeft[0] + (u * self.myPhotoDiameter)
+        alts = np.array(common.SamplingPatternAlts, dtype=np.float64)
+        azis = np.full(len(alts), 90.0)
+        usIdeal, vs = utility_angles.SkyCoords2FisheyeUVs(azis, alts, lenswarp=False)  # ideal lens
+        usReal, vs = utility_angles.SkyCoords2FisheyeUVs(azis, alts)                   # warped lens
+        for i, alt in enumerate(common.SamplingPatternAlts):
+            x = self.myPhotoTopLeft[0] + (usIdeal[i] * self.myPhotoDiameter)
             r = x - self.viewCenter[0]
-            self.lensIdealRadii.append((r, alt))  # (radius, altitude)
-            # warped lens
-            u, v = utility_angles.SkyCoord2FisheyeUV(90, alt)
-            x = self.myPhotoTopLeft[0] + (u * self.myPhotoDiameter)
+            self.lensIdealRadii.append((float(r), alt))  # (radius, altitude)
+            x = self.myPhotoTopLeft[0] + (usReal[i] * self.myPhotoDiameter)
             r = x - self.viewCenter[0]
-            self.lensRealRadii.append((r, alt))   # (radius, altitude)
+            self.lensRealRadii.append((float(r), alt))   # (radius, altitude)
 
         # compute sun path screen points
         self.pathSun = QPainterPath()
         if len(self.sunPathPoints) > 0:
-            azi, alt, dt = self.sunPathPoints[0]
-            u, v = utility_angles.SkyCoord2FisheyeUV(azi, alt)
-            x = self.myPhotoTopLeft[0] + (u * self.myPhotoDiameter)
-            y = self.myPhotoTopLeft[1] + (v * self.myPhotoDiameter)
-            self.pathSun.moveTo(x, y)
+            us, vs = utility_angles.SkyCoords2FisheyeUVs([p[0] for p in self.sunPathPoints], [p[1] for p in self.sunPathPoints])
+            xs = (self.myPhotoTopLeft[0] + (us * self.myPhotoDiameter)).tolist()
+            ys = (self.myPhotoTopLeft[1] + (vs * self.myPhotoDiameter)).tolist()
+            self.pathSun.moveTo(xs[0], ys[0])
             for i in range(1, len(self.sunPathPoints)):
-                azi, alt, dt = self.sunPathPoints[i]
-                u, v = utility_angles.SkyCoord2FisheyeUV(azi, alt)
-                x = self.myPhotoTopLeft[0] + (u * self.myPhotoDiameter)
-                y = self.myPhotoTopLeft[1] + (v * self.myPhotoDiameter)
-                self.pathSun.lineTo(x, y)
+                self.pathSun.lineTo(xs[i], ys[i])
 
         # compute sun position screen point
         u, v = utility_angles.SkyCoord2FisheyeUV(self.sunPosition[0], self.sunPosition[1])
@@ -490,6 +504,230 @@ class ViewFisheye(QWidget):
 
         # compute new mask
         self.mask = QPixmap(self.width(), self.height()).toImage()
+        maskPainter = QPainter()
+        maskPainter.begin(self.mask)
+        maskPainter.setBrush(QBrush(Qt.magenta, Qt.SolidPattern))
+        maskPainter.drawEllipse(self.viewCenter[0] - self.myPhotoRadius, self.viewCenter[1] - self.myPhotoRadius, self.myPhotoDiameter, self.myPhotoDiameter)
+        maskPainter.end()
+
+        # HUD layers only need rendering again if anything they are drawn at moved
+        bounds = (self.width(), self.height(), QRect(self.myPhotoDestRect), common.AppSettings["HUDTextScale"])
+        if bounds != self.layersBounds:
+            self.layersBounds = bounds
+            self.invalidateLayers()
+
+    def scalePhoto(self):
+        # scaling a full resolution photo on every paint (e.g. every mouse move) is expensive
+        # so it is scaled once to its size on screen, and again only when photo or size changes
+        size = self.myPhotoDestRect.size()
+        if self.myPhotoScaledKey == self.myPhoto.cacheKey() and self.myPhotoScaled.size() == size:
+            return
+        self.myPhotoScaled = QPixmap.fromImage(self.myPhoto.scaled(size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation))
+        self.myPhotoScaledKey = self.myPhoto.cacheKey()
+
+    def invalidateLayers(self, *layers):
+        # no layers means all of them
+        if len(layers) <= 0:
+            self.layers.clear()
+        for layer in layers:
+            self.layers.pop(layer, None)
+        self.overlay = None
+
+    def renderOverlay(self):
+        # static HUD layers are rendered once, then composited into one overlay that is reused until one of them changes
+        if self.overlay is not None:
+            return self.overlay
+        layers = [(ViewFisheye.Layer.Grid, common.AppSettings["ShowUVGrid"], self.paintGrid),
+                  (ViewFisheye.Layer.LensWarp, common.AppSettings["ShowLensWarp"], self.paintLensWarp),
+                  (ViewFisheye.Layer.Compass, common.AppSettings["ShowCompass"], self.paintCompass),
+                  (ViewFisheye.Layer.Samples, common.AppSettings["ShowSamples"], self.paintSamples),
+                  (ViewFisheye.Layer.SunPath, common.AppSettings["ShowSunPath"], self.paintSunPath),
+                  (ViewFisheye.Layer.Selected, True, self.paintSelected),
+                  (ViewFisheye.Layer.Info, True, self.paintInfo)]
+        self.overlay = QPixmap(self.size())
+        self.overlay.fill(Qt.transparent)
+        painter = QPainter()
+        painter.begin(self.overlay)
+        for layer, show, paint in layers:
+            if not show:
+                continue
+            if layer not in self.layers:
+                self.layers[layer] = self.renderLayer(paint)
+            painter.drawPixmap(0, 0, self.layers[layer])
+        painter.end()
+        return self.overlay
+
+    def renderLayer(self, paint):
+        pixmap = QPixmap(self.size())
+        pixmap.fill(Qt.transparent)
+        painter = QPainter()
+        painter.begin(pixmap)
+        painter.setBackgroundMode(Qt.TransparentMode)
+        painter.setBrush(Qt.NoBrush)
+        painter.setFont(self.fontScaled)
+        paint(painter)
+        painter.end()
+        return pixmap
+
+    def paintGrid(self, painter):
+        destRect = QRect(0, 0, self.myPhotoDestRect.width(), self.myPhotoDestRect.height())
+        fontWidth = self.fontMetrics.width("X")
+        # draw UV grid
+        painter.setPen(self.penText)
+        # box
+        tl = self.myPhotoTopLeft
+        tr = (self.viewCenter[0] + self.myPhotoRadius, self.viewCenter[1] - self.myPhotoRadius)
+        bl = (self.viewCenter[0] - self.myPhotoRadius, self.viewCenter[1] + self.myPhotoRadius)
+        br = (self.viewCenter[0] + self.myPhotoRadius, self.viewCenter[1] + self.myPhotoRadius)
+        painter.drawLine(tl[0], tl[1], tr[0], tr[1])
+        painter.drawLine(bl[0], bl[1], br[0], br[1])
+        painter.drawLine(tl[0], tl[1], bl[0], bl[1])
+        painter.drawLine(tr[0], tr[1], br[0], br[1])
+        # crosshairs
+        painter.drawLine(tl[0], self.viewCenter[1], tr[0], self.viewCenter[1])
+        painter.drawLine(self.viewCenter[0], tr[1], self.viewCenter[0], br[1])
+        # labels
+        destRect.setCoords(tl[0] + 4, tl[1] + 4, self.width(), self.height())
+        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "0")
+        destRect.setCoords(tr[0] - (fontWidth+4), tr[1] + 4, self.width(), self.height())
+        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "1")
+        destRect.setCoords(bl[0] + 3, bl[1] - (self.fontMetrics.height()+3), self.width(), self.height())
+        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "1")
+        destRect.setCoords(br[0] - (fontWidth+3), br[1] - (self.fontMetrics.height()+3), self.width(), self.height())
+        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "1")
+        # grid coordinates
+        gpntrad = self.myPhotoRadius * 0.005
+        painter.setPen(self.penText)
+        painter.setBrush(self.brushGrid)
+        painter.setFont(self.fontScaled)
+        for i in range(0, len(self.gridpoints)):
+            point = self.gridpoints[i]
+            u, v = self.gridUVs[i]
+            t, p = self.gridskycoords[i]
+            painter.drawEllipse(QPoint(point[0], point[1]), gpntrad, gpntrad)
+            destRect.setCoords(point[0]+fontWidth/2, point[1]-self.fontMetrics.height(), self.width(), self.height())
+            textuv = "{0:.1f}u, {1:.1f}v".format(round(u,1), round(v,1))
+            painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, textuv)
+            destRect.setCoords(point[0]+fontWidth/2, point[1], self.width(), self.height())
+            textuv = "{0:d}°, {1:d}°".format(int(round(t)), int(round(p)))
+            painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, textuv)
+        painter.setBrush(Qt.NoBrush)
+
+    def paintLensWarp(self, painter):
+        destRect = QRect(0, 0, self.myPhotoDestRect.width(), self.myPhotoDestRect.height())
+        centerPoint = QPoint(self.viewCenter[0], self.viewCenter[1])
+        # draw lens warp
+        # ideal lens longitudes along azimuth
+        painter.setPen(self.penText)
+        for i in range(0, int(len(self.compassTicks)/2), 3):
+            p1 = QPoint(self.compassTicks[i][2], self.compassTicks[i][3])
+            p2 = QPoint(self.compassTicks[i+18][2], self.compassTicks[i+18][3])  # tick opposite 180 degrees
+            painter.drawLine(p1, p2)
+        # ideal lens latitudes along zenith
+        for r, alt in self.lensIdealRadii:
+            painter.drawEllipse(centerPoint, r, r)
+        # actual/warped lens latitudes along zenith
+        painter.setPen(self.penLens)
+        for r, alt in self.lensRealRadii:
+            painter.drawEllipse(centerPoint, r, r)
+            destRect.setCoords(self.viewCenter[0] + r + 3, self.viewCenter[1] - (self.fontMetrics.height() + 3), self.width(), self.height())
+            painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "{0:d}°".format(int(alt)))
+
+    def paintCompass(self, painter):
+        destRect = QRect(0, 0, self.myPhotoDestRect.width(), self.myPhotoDestRect.height())
+        fontWidth = self.fontMetrics.width("X")
+        centerPoint = QPoint(self.viewCenter[0], self.viewCenter[1])
+        # draw compass
+        # compass ticks text shadows
+        if common.AppSettings["ShowShadows"]:
+            painter.setPen(self.penShadowText)
+            for tick in self.compassTicks:
+                destRect.setCoords(tick[4] + 1, tick[5] + 1, self.width(), self.height())
+                painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, str(tick[6])+"°")
+        # compass ticks text
+        painter.setPen(self.penText)
+        for tick in self.compassTicks:
+            painter.drawLine(tick[0], tick[1], tick[2], tick[3])
+            destRect.setCoords(tick[4], tick[5], self.width(), self.height())
+            painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, str(tick[6])+"°")
+        # photo radius
+        #painter.drawEllipse(self.viewCenter[0] - self.myPhotoRadius, self.viewCenter[1] - self.myPhotoRadius, self.myPhotoDiameter, self.myPhotoDiameter)
+        painter.drawEllipse(centerPoint, self.myPhotoRadius, self.myPhotoRadius)
+        # cardinal directions
+        destRect.setCoords(self.viewCenter[0] - self.myPhotoRadius - (fontWidth+4), self.viewCenter[1] - self.fontMetrics.height()/2, self.width(), self.height())
+        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "W")
+        destRect.setCoords(self.viewCenter[0] + self.myPhotoRadius + 4, self.viewCenter[1] - self.fontMetrics.height()/2, self.width(), self.height())
+        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "E")
+        destRect.setCoords(self.viewCenter[0] - fontWidth/2, self.viewCenter[1] - self.myPhotoRadius - (self.fontMetrics.height()+3), self.width(), self.height())
+        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "S")
+        destRect.setCoords(self.viewCenter[0] - fontWidth/2, self.viewCenter[1] + self.myPhotoRadius + 3, self.width(), self.height())
+        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "N")
+
+    def paintSamples(self, painter):
+        # draw sampling pattern
+        painter.setPen(self.penText)
+        for i, points in enumerate(self.sampleAreaVisible):
+            painter.drawLine(QLine(points[0], points[1]))
+            painter.drawLine(QLine(points[1], points[2]))
+            painter.drawLine(QLine(points[2], points[3]))
+            painter.drawLine(QLine(points[3], points[0]))
+        for i in range(0, len(self.samplePoints)):
+            p = self.samplePoints[i]
+            painter.drawEllipse(QPoint(p[0],p[1]), ViewFisheye.SampleRadius, ViewFisheye.SampleRadius)
+            painter.drawText(p[0] + ViewFisheye.SampleRadius, p[1], str(i))
+
+    def paintSunPath(self, painter):
+        destRect = QRect(0, 0, self.myPhotoDestRect.width(), self.myPhotoDestRect.height())
+        # draw sun path
+        sunradius = self.myPhotoRadius * 0.1
+        # shadows
+        painter.setPen(self.penShadowSun)
+        if common.AppSettings["ShowShadows"]:
+            painter.drawEllipse(QPoint(self.sunPositionVisible[0]+1, self.sunPositionVisible[1]+1), sunradius, sunradius)
+            self.pathSun.translate(1.0, 1.0)
+            painter.drawPath(self.pathSun)
+            self.pathSun.translate(-1.0, -1.0)
+            for i in range(0, self.pathSun.elementCount()):
+                e = self.pathSun.elementAt(i)
+                destRect.setCoords(e.x, e.y + self.fontMetrics.height()/2 + 1, self.width(), self.height())
+                painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, str(self.sunPathPoints[i][2].hour))
+        # sun, path, hours
+        painter.setPen(self.penSun)
+        painter.drawEllipse(QPoint(self.sunPositionVisible[0], self.sunPositionVisible[1]), sunradius, sunradius)
+        painter.drawPath(self.pathSun)
+        for i in range(0, self.pathSun.elementCount()):
+            e = self.pathSun.elementAt(i)
+            destRect.setCoords(e.x, e.y + self.fontMetrics.height() / 2, self.width(), self.height())
+            painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, str(self.sunPathPoints[i][2].hour))
+
+    def paintSelected(self, painter):
+        # draw selected samples (ALWAYS)
+        # shadows
+        if common.AppSettings["ShowShadows"]:
+            painter.setPen(self.penShadowSelected)
+            for i in self.samplesSelected:
+                x, y = self.samplePoints[i]
+                painter.drawEllipse(QPoint(x+1, y+1), ViewFisheye.SampleRadius, ViewFisheye.SampleRadius)
+        # samples
+        for i in self.samplesSelected:
+            painter.setPen(self.penSelected[i])
+            x, y = self.samplePoints[i]
+            painter.drawEllipse(QPoint(x, y), ViewFisheye.SampleRadius, ViewFisheye.SampleRadius)
+
+    def paintInfo(self, painter):
+        destRect = QRect(0, 0, self.myPhotoDestRect.width(), self.myPhotoDestRect.height())
+        # draw timestamp
+        painter.setPen(self.penText)
+        painter.setFont(self.fontFixed)
+        destRect.setCoords(10, 10, self.width() / 2, 50)
+        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, str(self.myPhotoTime))
+        # draw sky cover assessment
+        destRect.setCoords(10, 25, self.width(), self.height())
+        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, self.skyCover.name + "/" + common.SkyCoverDesc[self.skyCover])
+        # draw photo rotation
+        if self.myPhotoRotation != 0:
+            destRect.setCoords(10, self.height()-25, self.width(), self.height())
+            painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "Rotation: " + str(self.myPhotoRotation) + "°")
 
     def paintEvent(self, event):
         super().paintEvent(event)
@@ -519,21 +757,14 @@ class ViewFisheye(QWidget):
             transform.rotate(-self.myPhotoRotation)
             transform.translate(-self.myPhotoDestRect.center().x(), -self.myPhotoDestRect.center().y())
             painter.setTransform(transform)
-            painter.drawImage(self.myPhotoDestRect, self.myPhoto, self.myPhotoSrcRect) # draw it
+            painter.drawPixmap(self.myPhotoDestRect, self.myPhotoScaled) # draw it (pre-scaled)
             painter.resetTransform()
 
             # useful local vars
-            centerPoint = QPoint(self.viewCenter[0], self.viewCenter[1])
             destRect = QRect(0, 0, self.myPhotoDestRect.width(), self.myPhotoDestRect.height())
-            fontWidth = self.fontMetrics.width("X")
 
             # mask
             if common.AppSettings["ShowMask"]:
-                maskPainter = QPainter()
-                maskPainter.begin(self.mask)
-                maskPainter.setBrush(QBrush(Qt.magenta, Qt.SolidPattern))
-                maskPainter.drawEllipse(self.viewCenter[0] - self.myPhotoRadius, self.viewCenter[1] - self.myPhotoRadius, self.myPhotoDiameter, self.myPhotoDiameter)
-                maskPainter.end()
                 painter.setCompositionMode(QPainter.CompositionMode_DestinationIn)
                 painter.drawImage(0, 0, self.mask)
                 painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
@@ -543,144 +774,9 @@ class ViewFisheye(QWidget):
                 painter.setBackgroundMode(Qt.TransparentMode)
                 #painter.setBackground(Qt.black)
                 painter.setBrush(Qt.NoBrush)
-                painter.setFont(self.fontScaled)
-
-                # draw UV grid
-                if common.AppSettings["ShowUVGrid"]:
-                    painter.setPen(self.penText)
-                    # box
-                    tl = self.myPhotoTopLeft
-                    tr = (self.viewCenter[0] + self.myPhotoRadius, self.viewCenter[1] - self.myPhotoRadius)
-                    bl = (self.viewCenter[0] - self.myPhotoRadius, self.viewCenter[1] + self.myPhotoRadius)
-                    br = (self.viewCenter[0] + self.myPhotoRadius, self.viewCenter[1] + self.myPhotoRadius)
-                    painter.drawLine(tl[0], tl[1], tr[0], tr[1])
-                    painter.drawLine(bl[0], bl[1], br[0], br[1])
-                    painter.drawLine(tl[0], tl[1], bl[0], bl[1])
-                    painter.drawLine(tr[0], tr[1], br[0], br[1])
-                    # crosshairs
-                    painter.drawLine(tl[0], self.viewCenter[1], tr[0], self.viewCenter[1])
-                    painter.drawLine(self.viewCenter[0], tr[1], self.viewCenter[0], br[1])
-                    # labels
-                    destRect.setCoords(tl[0] + 4, tl[1] + 4, self.width(), self.height())
-                    painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "0")
-                    destRect.setCoords(tr[0] - (fontWidth+4), tr[1] + 4, self.width(), self.height())
-                    painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "1")
-                    destRect.setCoords(bl[0] + 3, bl[1] - (self.fontMetrics.height()+3), self.width(), self.height())
-                    painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "1")
-                    destRect.setCoords(br[0] - (fontWidth+3), br[1] - (self.fontMetrics.height()+3), self.width(), self.height())
-                    painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "1")
-                    # grid coordinates
-                    gpntrad = self.myPhotoRadius * 0.005
-                    painter.setPen(self.penText)
-                    painter.setBrush(self.brushGrid)
-                    painter.setFont(self.fontScaled)
-                    for i in range(0, len(self.gridpoints)):
-                        point = self.gridpoints[i]
-                        u, v = self.gridUVs[i]
-                        t, p = self.gridskycoords[i]
-                        painter.drawEllipse(QPoint(point[0], point[1]), gpntrad, gpntrad)
-                        destRect.setCoords(point[0]+fontWidth/2, point[1]-self.fontMetrics.height(), self.width(), self.height())
-                        textuv = "{0:.1f}u, {1:.1f}v".format(round(u,1), round(v,1))
-                        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, textuv)
-                        destRect.setCoords(point[0]+fontWidth/2, point[1], self.width(), self.height())
-                        textuv = "{0:d}°, {1:d}°".format(int(round(t)), int(round(p)))
-                        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, textuv)
-                    painter.setBrush(Qt.NoBrush)
-
-                # draw lens warp
-                if common.AppSettings["ShowLensWarp"]:
-                    # ideal lens longitudes along azimuth
-                    painter.setPen(self.penText)
-                    for i in range(0, int(len(self.compassTicks)/2), 3):
-                        p1 = QPoint(self.compassTicks[i][2], self.compassTicks[i][3])
-                        p2 = QPoint(self.compassTicks[i+18][2], self.compassTicks[i+18][3])  # tick opposite 180 degrees
-                        painter.drawLine(p1, p2)
-                    # ideal lens latitudes along zenith
-                    for r, alt in self.lensIdealRadii:
-                        painter.drawEllipse(centerPoint, r, r)
-                    # actual/warped lens latitudes along zenith
-                    painter.setPen(self.penLens)
-                    for r, alt in self.lensRealRadii:
-                        painter.drawEllipse(centerPoint, r, r)
-                        destRect.setCoords(self.viewCenter[0] + r + 3, self.viewCenter[1] - (self.fontMetrics.height() + 3), self.width(), self.height())
-                        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "{0:d}°".format(int(alt)))
-
-                # draw compass
-                if common.AppSettings["ShowCompass"]:
-                    # compass ticks text shadows
-                    if common.AppSettings["ShowShadows"]:
-                        painter.setPen(self.penShadowText)
-                        for tick in self.compassTicks:
-                            destRect.setCoords(tick[4] + 1, tick[5] + 1, self.width(), self.height())
-                            painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, str(tick[6])+"°")
-                    # compass ticks text
-                    painter.setPen(self.penText)
-                    for tick in self.compassTicks:
-                        painter.drawLine(tick[0], tick[1], tick[2], tick[3])
-                        destRect.setCoords(tick[4], tick[5], self.width(), self.height())
-                        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, str(tick[6])+"°")
-                    # photo radius
-                    #painter.drawEllipse(self.viewCenter[0] - self.myPhotoRadius, self.viewCenter[1] - self.myPhotoRadius, self.myPhotoDiameter, self.myPhotoDiameter)
-                    painter.drawEllipse(centerPoint, self.myPhotoRadius, self.myPhotoRadius)
-                    # cardinal directions
-                    destRect.setCoords(self.viewCenter[0] - self.myPhotoRadius - (fontWidth+4), self.viewCenter[1] - self.fontMetrics.height()/2, self.width(), self.height())
-                    painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "W")
-                    destRect.setCoords(self.viewCenter[0] + self.myPhotoRadius + 4, self.viewCenter[1] - self.fontMetrics.height()/2, self.width(), self.height())
-                    painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "E")
-                    destRect.setCoords(self.viewCenter[0] - fontWidth/2, self.viewCenter[1] - self.myPhotoRadius - (self.fontMetrics.height()+3), self.width(), self.height())
-                    painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "S")
-                    destRect.setCoords(self.viewCenter[0] - fontWidth/2, self.viewCenter[1] + self.myPhotoRadius + 3, self.width(), self.height())
-                    painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "N")
-
-                # draw sampling pattern
-                if common.AppSettings["ShowSamples"]:
-                    painter.setPen(self.penText)
-                    for i, points in enumerate(self.sampleAreaVisible):
-                        painter.drawLine(QLine(points[0], points[1]))
-                        painter.drawLine(QLine(points[1], points[2]))
-                        painter.drawLine(QLine(points[2], points[3]))
-                        painter.drawLine(QLine(points[3], points[0]))
-                    for i in range(0, len(self.samplePoints)):
-                        p = self.samplePoints[i]
-                        painter.drawEllipse(QPoint(p[0],p[1]), ViewFisheye.SampleRadius, ViewFisheye.SampleRadius)
-                        painter.drawText(p[0] + ViewFisheye.SampleRadius, p[1], str(i))
-
-                # draw sun path
-                if common.AppSettings["ShowSunPath"]:
-                    sunradius = self.myPhotoRadius * 0.1
-                    # shadows
-                    painter.setPen(self.penShadowSun)
-                    if common.AppSettings["ShowShadows"]:
-                        painter.drawEllipse(QPoint(self.sunPositionVisible[0]+1, self.sunPositionVisible[1]+1), sunradius, sunradius)
-                        self.pathSun.translate(1.0, 1.0)
-                        painter.drawPath(self.pathSun)
-                        self.pathSun.translate(-1.0, -1.0)
-                        for i in range(0, self.pathSun.elementCount()):
-                            e = self.pathSun.elementAt(i)
-                            destRect.setCoords(e.x, e.y + self.fontMetrics.height()/2 + 1, self.width(), self.height())
-                            painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, str(self.sunPathPoints[i][2].hour))
-                    # sun, path, hours
-                    painter.setPen(self.penSun)
-                    painter.drawEllipse(QPoint(self.sunPositionVisible[0], self.sunPositionVisible[1]), sunradius, sunradius)
-                    painter.drawPath(self.pathSun)
-                    for i in range(0, self.pathSun.elementCount()):
-                        e = self.pathSun.elementAt(i)
-                        destRect.setCoords(e.x, e.y + self.fontMetrics.height() / 2, self.width(), self.height())
-                        painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, str(self.sunPathPoints[i][2].hour))
-
-                # draw selected samples (ALWAYS)
-                r = QRect()
-                # shadows
-                if common.AppSettings["ShowShadows"]:
-                    painter.setPen(self.penShadowSelected)
-                    for i in self.samplesSelected:
-                        x, y = self.samplePoints[i]
-                        painter.drawEllipse(QPoint(x+1, y+1), ViewFisheye.SampleRadius, ViewFisheye.SampleRadius)
-                # samples
-                for i in self.samplesSelected:
-                    painter.setPen(self.penSelected[i])
-                    x, y = self.samplePoints[i]
-                    painter.drawEllipse(QPoint(x, y), ViewFisheye.SampleRadius, ViewFisheye.SampleRadius)
+
+                # static layers (grid, compass, samples, sun path, etc.)
+                painter.drawPixmap(0, 0, self.renderOverlay())
 
                 # draw user's selection bounds
                 if (abs(self.dragSelectRect.right()-self.dragSelectRect.left()) >= ViewFisheye.SelectionRectMin and
@@ -688,18 +784,9 @@ class ViewFisheye(QWidget):
                     painter.setPen(self.penSelectRect)
                     painter.drawRect(self.dragSelectRect)
 
-                # draw timestamp
+                # everything from here on changes with the mouse
                 painter.setPen(self.penText)
                 painter.setFont(self.fontFixed)
-                destRect.setCoords(10, 10, self.width() / 2, 50)
-                painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, str(self.myPhotoTime))
-                # draw sky cover assessment
-                destRect.setCoords(10, 25, self.width(), self.height())
-                painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, self.skyCover.name + "/" + common.SkyCoverDesc[self.skyCover])
-                # draw photo rotation
-                if self.myPhotoRotation != 0:
-                    destRect.setCoords(10, self.height()-25, self.width(), self.height())
-                    painter.drawText(destRect, Qt.AlignTop | Qt.AlignLeft, "Rotation: " + str(self.myPhotoRotation) + "°")
 
                 # where is the mouse relative to the center?
                 # this is used as an optimization to only display information when mouse is in fisheye portion
@@ -728,7 +815,13 @@ class ViewFisheye(QWidget):
                                 int(coordsxy[1] / self.myPhotoDestRect.height() * self.myPhoto.height()))
                     coordsUV = ((self.coordsMouse[0] - self.myPhotoTopLeft[0]) / self.myPhotoDiameter,
                                 (self.coordsMouse[1] - self.myPhotoTopLeft[1]) / self.myPhotoDiameter)
-                    coordsTP = utility_angles.FisheyeUV2SkyCoord(coordsUV[0], coordsUV[1])
+                    # lookup maps may still be building, and have no coordinates at the rim (outside the circle of pixels)
+                    if self.mySkyMap is None:
+                        self.mySkyMap = utility_skymap.requestSkyMap(self.myPhoto.width(), self.myPhoto.height(), common.AppSettings["DataDirectory"])
+                    if self.mySkyMap is not None:
+                        coordsTP = self.mySkyMap.skyCoords(coordsXY[0], coordsXY[1])
+                    if self.mySkyMap is None or np.isnan(coordsTP[0]) or np.isnan(coordsTP[1]):
+                        coordsTP = utility_angles.FisheyeUV2SkyCoord(coordsUV[0], coordsUV[1])
                     # text
                     textxy = str(coordsxy[0]) + ", " + str(coordsxy[1]) + " xy"
                     textXY = str(coordsXY[0]) + ", " + str(coordsXY[1]) + " xy"
@@ -751,7 +844,9 @@ class ViewFisheye(QWidget):
                         colorsRegion = self.myPhotoPixels[rstart:rstop, cstart:cstop]
                         colorFinal = colorsRegion[halfdim, halfdim]
                         if pixreg > 1:  # with pixel weighting
-                            colorFinal = utility_data.collectPixels([coordsXY], [pixreg], pixels=self.myPhotoPixels, weighting=common.PixelWeighting(common.AppSettings["PixelWeighting"]))[0]
+                            weighting = common.PixelWeighting(common.AppSettings["PixelWeighting"])
+                            # one region is cheap to weight directly (a summed-area table costs a pass over the whole photo, only exports pay off)
+                            colorFinal = utility_data.collectPixels([coordsXY], [pixreg], pixels=self.myPhotoPixels, weighting=weighting)[0]
                     textPX = str(colorFinal[0]) + " " + str(colorFinal[1]) + " " + str(colorFinal[2]) + " px"
 
                 # draw HUD text strings